@@ -425,7 +425,7 @@ class AppWindow(QtWidgets.QMainWindow, Ui_MainWindow):
             try:
                 # 直接将当前内存中的数据写入目标路径
                 with open(path, "w", encoding="utf-8") as f:
-                    json.dump(self.grid.temp_data.data, f, ensure_ascii=False, indent=2)
+                    json.dump(self.grid.temp_data.as_dict(), f, ensure_ascii=False, indent=2)
                 
                 # 更新项目名称显示
                 filename = os.path.basename(path)
@@ -451,8 +451,7 @@ class AppWindow(QtWidgets.QMainWindow, Ui_MainWindow):
                     raise ValueError("无效的工程文件格式")
 
                 # 更新临时数据并同步到文件
-                self.grid.temp_data.data = new_data
-                self.grid.temp_data._save()
+                self.grid.temp_data.replace(new_data)
                 
                 # 更新项目名称显示
                 filename = os.path.basename(path)
@@ -493,6 +492,8 @@ class AppWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         if not hasattr(self, "grid") or not hasattr(self.grid, "temp_data"):
             return
             
+        # 计算引擎直接读取临时文件，先把尚未落盘的修改写入
+        self.grid.temp_data.flush()
         json_path = self.grid.temp_data.json_path
         manager = CalculationManager(json_path)
         response = manager.run(fluid=self.current_fluid)
@@ -40,8 +40,11 @@ class Node:
                 # === 离心泵 (P-Q 曲线模型) ===
                 # 特点：升压能力随流量增大而下降
                 self.pump_mode = "curve"
-                H_rated_kpa = float(data.get("pump_head", 500)) # 额定压力 (kPa)
-                Q_rated_m3h = float(data.get("pump_flow", 10)) # 额定流量 (m³/h)
+                # 未填写（缺失或空串）时取默认值；显式填写的 0 照常使用
+                head = data.get("pump_head")
+                flow = data.get("pump_flow")
+                H_rated_kpa = float(500 if head is None or head == "" else head) # 额定压力 (kPa)
+                Q_rated_m3h = float(10 if flow is None or flow == "" else flow) # 额定流量 (m³/h)
                 # 离心泵的关键参数：关死扬程 (流量为0时的压力)
                 H_shutoff_kpa = float(data.get("pump_speed", H_rated_kpa * 1.2) or H_rated_kpa * 1.2)
                 
@@ -1,7 +1,97 @@
 import json
 import os
 import time
-from typing import List, Dict
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Optional, Sequence, Tuple
+
+
+# 默认库中重复出现的分类/备注文本
+_CAT_ELBOW = "弯头"
+_CAT_PIPE = "直管"
+_CAT_VALVE = "阀门"
+_RK_MM = "单位:mm"
+_RK_GPM = "Cv单位:gpm"
+_RK_R15D = "R≈1.5D"
+
+# 默认管件库条目，模块级常量只构建一次
+_DEFAULT_FITTINGS = (
+    {"id": "elbow45", "name": "45°弯头", "category": _CAT_ELBOW, "angle": 45, "k": 0.3, "inDiameter": "/", "outDiameter": "/", "remark": "单位:角度(°),直径(mm)"},
+    {"id": "elbow90", "name": "90°弯头", "category": _CAT_ELBOW, "angle": 90, "k": 1.2, "inDiameter": "/", "outDiameter": "/", "remark": "单位:角度(°),直径(mm)"},
+    {"id": "expansion", "name": "渐扩", "category": "渐扩", "angle": "", "k": 0.4, "inDiameter": "/", "outDiameter": "/", "remark": "单位:直径(mm)"},
+    {"id": "contraction", "name": "渐缩", "category": "渐缩", "angle": "", "k": 0.8, "inDiameter": "/", "outDiameter": "/", "remark": "单位:直径(mm)"},
+    # 直管示例（GB/T 8163 部分规格）
+    {"id": "pipe_dn15", "name": "DN15", "category": _CAT_PIPE, "dn": 15, "od": 21.3, "thickness": 2.8, "id_mm": 15.7, "remark": _RK_MM},
+    {"id": "pipe_dn20", "name": "DN20", "category": _CAT_PIPE, "dn": 20, "od": 26.9, "thickness": 2.8, "id_mm": 21.3, "remark": _RK_MM},
+    {"id": "pipe_dn25", "name": "DN25", "category": _CAT_PIPE, "dn": 25, "od": 33.7, "thickness": 3.2, "id_mm": 27.3, "remark": _RK_MM},
+    {"id": "pipe_dn32", "name": "DN32", "category": _CAT_PIPE, "dn": 32, "od": 42.4, "thickness": 3.5, "id_mm": 35.4, "remark": _RK_MM},
+    {"id": "pipe_dn40", "name": "DN40", "category": _CAT_PIPE, "dn": 40, "od": 48.3, "thickness": 3.5, "id_mm": 41.3, "remark": _RK_MM},
+    {"id": "pipe_dn50", "name": "DN50", "category": _CAT_PIPE, "dn": 50, "od": 60.3, "thickness": 3.8, "id_mm": 52.7, "remark": _RK_MM},
+    {"id": "pipe_dn65", "name": "DN65", "category": _CAT_PIPE, "dn": 65, "od": 76.1, "thickness": 4.0, "id_mm": 68.1, "remark": _RK_MM},
+    {"id": "pipe_dn80", "name": "DN80", "category": _CAT_PIPE, "dn": 80, "od": 88.9, "thickness": 4.0, "id_mm": 80.9, "remark": _RK_MM},
+    {"id": "pipe_dn100", "name": "DN100", "category": _CAT_PIPE, "dn": 100, "od": 114.3, "thickness": 4.5, "id_mm": 105.3, "remark": _RK_MM},
+    # 弯头/弯管
+    {"id": "elbow45_long", "name": "45°长半径弯头", "category": _CAT_ELBOW, "angle": 45, "k": 0.20, "remark": _RK_R15D},
+    {"id": "elbow90_long", "name": "90°长半径弯头", "category": _CAT_ELBOW, "angle": 90, "k": 0.30, "remark": _RK_R15D},
+    {"id": "elbow90_short", "name": "90°短半径弯头", "category": _CAT_ELBOW, "angle": 90, "k": 0.45, "remark": "R≈1.0D"},
+    {"id": "elbow90_miter", "name": "90°直角弯头", "category": _CAT_ELBOW, "angle": 90, "k": 1.10, "remark": "R≈0"},
+    {"id": "elbow180_return", "name": "180°回弯头", "category": _CAT_ELBOW, "angle": 180, "k": 0.35, "remark": _RK_R15D},
+    {"id": "elbow60_bend", "name": "60°煨弯管", "category": _CAT_ELBOW, "angle": 60, "k": 0.15, "remark": "R≥3D"},
+    # 三通
+    {"id": "tee_equal", "name": "等径三通", "category": "三通", "spec": "Equal Tee", "k_run": 0.15, "k_branch": 0.85, "remark": "单位:mm, 主支管径一致"},
+    {"id": "tee_45_y", "name": "45°Y型三通", "category": "三通", "spec": "45° Y-Tee", "k_run": 0.12, "k_branch": 0.40, "remark": "单位:mm, 分流更顺畅"},
+    {"id": "tee_reducing", "name": "异径三通", "category": "三通", "spec": "Reducing Tee", "k_run": 0.20, "k_branch": 0.90, "remark": "单位:mm, 支管口径小于主管"},
+    # 变径
+    {"id": "reducer_concentric", "name": "同心渐缩管", "category": "渐缩", "spec": "Concentric Reducer", "angle": "≈15°", "k": 0.05, "remark": "水平/垂直管路通用"},
+    {"id": "reducer_eccentric", "name": "偏心渐缩管", "category": "渐缩", "spec": "Eccentric Reducer", "angle": "≈15°", "k": 0.06, "remark": "泵入口专用防气蚀"},
+    {"id": "reducer_sudden_con", "name": "突缩管", "category": "渐缩", "spec": "Sudden Contraction", "angle": "90°", "k": 0.50, "remark": "直接变径阻力大"},
+    {"id": "reducer_sudden_exp", "name": "突扩管", "category": "渐扩", "spec": "Sudden Expansion", "angle": "90°", "k": 1.00, "remark": "出口排入油箱类突扩"},
+    # 阀门
+    {"id": "valve_ball_dn25", "name": "球阀 DN25", "category": _CAT_VALVE, "dn": 25, "Cv": 35, "Kv": 30, "resistance": "极低阻力", "remark": _RK_GPM},
+    {"id": "valve_ball_dn50", "name": "球阀 DN50", "category": _CAT_VALVE, "dn": 50, "Cv": 180, "Kv": 155, "resistance": "极低阻力", "remark": _RK_GPM},
+    {"id": "valve_globe_dn25", "name": "截止阀 DN25", "category": _CAT_VALVE, "dn": 25, "Cv": 13, "Kv": 11, "resistance": "高阻力", "remark": _RK_GPM},
+    {"id": "valve_globe_dn50", "name": "截止阀 DN50", "category": _CAT_VALVE, "dn": 50, "Cv": 45, "Kv": 39, "resistance": "高阻力", "remark": _RK_GPM},
+    {"id": "valve_globe_dn80", "name": "截止阀 DN80", "category": _CAT_VALVE, "dn": 80, "Cv": 110, "Kv": 95, "resistance": "高阻力", "remark": _RK_GPM},
+    {"id": "valve_butterfly_dn100", "name": "蝶阀 DN100", "category": _CAT_VALVE, "dn": 100, "Cv": 350, "Kv": 300, "resistance": "中阻力", "remark": _RK_GPM},
+    {"id": "valve_check_dn25", "name": "单向阀 DN25", "category": _CAT_VALVE, "dn": 25, "Cv": 15, "Kv": 13, "resistance": "中阻力", "remark": _RK_GPM},
+    {"id": "valve_check_dn50", "name": "单向阀 DN50", "category": _CAT_VALVE, "dn": 50, "Cv": 55, "Kv": 47, "resistance": "中阻力", "remark": _RK_GPM},
+    # 泵 - 简化为两类
+    {"id": "pump_displacement", "name": "容积泵 (齿轮/螺杆)", "category": "泵", "pump_type": "gear", "flow": 1.5, "pressure": 250.0, "remark": "流量恒定, 压力随阻力变化"},
+    {"id": "pump_centrifugal", "name": "离心泵 (性能曲线)", "category": "泵", "pump_type": "curve", "flow": 10.0, "pressure": 500.0, "shutoff_pressure": 600.0, "remark": "流量随压力增加而减小"},
+    # 油品 (流体) - 仅保留三种特定油品
+    {"id": "oil_vg320", "name": "VG320 滑油", "category": "油品", "rho_15": 920.0, "v_40": 347.8, "v_100": 25.0, "remark": "密度920kg/m³, 40℃粘度0.32Pa·s"},
+    {"id": "oil_vg220", "name": "VG220 滑油", "category": "油品", "rho_15": 900.0, "v_40": 244.4, "v_100": 19.0, "remark": "密度900kg/m³, 40℃粘度0.22Pa·s"},
+    {"id": "oil_vg46", "name": "VG46 液压油", "category": "油品", "rho_15": 875.0, "v_40": 46.0, "v_100": 6.8, "remark": "常用轻质润滑油"},
+)
+
+# 默认条目的 id -> 下标索引（只读），未修改过的默认库直接复用，无需逐实例构建
+_DEFAULT_INDEX = MappingProxyType({d["id"]: i for i, d in enumerate(_DEFAULT_FITTINGS)})
+
+
+def _parse_angle(v) -> Optional[Tuple[float, bool]]:
+    """解析角度字段：45 / "90°" / "≈15°" -> (角度值, 是否近似)；无法解析返回 None"""
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return float(v), False
+    if not isinstance(v, str):
+        return None
+    text = v.strip()
+    approx = text.startswith("≈")
+    text = text.lstrip("≈").rstrip("°").strip()
+    try:
+        return float(text), approx
+    except ValueError:
+        return None
+
+
+def _normalize_angle(d: Dict):
+    """为含角度的条目补充数值字段 angle_deg/angle_approx，原 angle 字段保留用于界面显示"""
+    if "angle" not in d:
+        return
+    parsed = _parse_angle(d["angle"])
+    if parsed is None:
+        d.pop("angle_deg", None)
+        d.pop("angle_approx", None)
+    else:
+        d["angle_deg"], d["angle_approx"] = parsed
 
 
 class FittingsStore:
@@ -11,6 +101,11 @@ class FittingsStore:
         self.base_dir = base_dir
         self.path = os.path.join(base_dir, "fittings.json")
         self.data: List[Dict] = []
+        self._index: Mapping[str, int] = _DEFAULT_INDEX
+        self._last_saved_hash: Optional[int] = None
+        self._mtime_ns: Optional[int] = None  # 内存数据对应的文件修改时间
+        self._by_category: Dict[str, List[Dict]] = {}  # 分类 -> 条目（保持 data 中的先后顺序）
+        self.revision = 0  # 数据版本号：整体替换或增删改条目时递增，供调用方判断缓存是否失效
         self._ensure_dir()
         self._load()
 
@@ -18,97 +113,134 @@ class FittingsStore:
         os.makedirs(self.base_dir, exist_ok=True)
 
     def _default_data(self) -> List[Dict]:
-        return [
-            {"id": "elbow45", "name": "45°弯头", "category": "弯头", "angle": 45, "k": 0.3, "inDiameter": "/", "outDiameter": "/", "remark": "单位:角度(°),直径(mm)"},
-            {"id": "elbow90", "name": "90°弯头", "category": "弯头", "angle": 90, "k": 1.2, "inDiameter": "/", "outDiameter": "/", "remark": "单位:角度(°),直径(mm)"},
-            {"id": "expansion", "name": "渐扩", "category": "渐扩", "angle": "", "k": 0.4, "inDiameter": "/", "outDiameter": "/", "remark": "单位:直径(mm)"},
-            {"id": "contraction", "name": "渐缩", "category": "渐缩", "angle": "", "k": 0.8, "inDiameter": "/", "outDiameter": "/", "remark": "单位:直径(mm)"},
-            # 直管示例（GB/T 8163 部分规格）
-            {"id": "pipe_dn15", "name": "DN15", "category": "直管", "dn": 15, "od": 21.3, "thickness": 2.8, "id_mm": 15.7, "remark": "单位:mm"},
-            {"id": "pipe_dn20", "name": "DN20", "category": "直管", "dn": 20, "od": 26.9, "thickness": 2.8, "id_mm": 21.3, "remark": "单位:mm"},
-            {"id": "pipe_dn25", "name": "DN25", "category": "直管", "dn": 25, "od": 33.7, "thickness": 3.2, "id_mm": 27.3, "remark": "单位:mm"},
-            {"id": "pipe_dn32", "name": "DN32", "category": "直管", "dn": 32, "od": 42.4, "thickness": 3.5, "id_mm": 35.4, "remark": "单位:mm"},
-            {"id": "pipe_dn40", "name": "DN40", "category": "直管", "dn": 40, "od": 48.3, "thickness": 3.5, "id_mm": 41.3, "remark": "单位:mm"},
-            {"id": "pipe_dn50", "name": "DN50", "category": "直管", "dn": 50, "od": 60.3, "thickness": 3.8, "id_mm": 52.7, "remark": "单位:mm"},
-            {"id": "pipe_dn65", "name": "DN65", "category": "直管", "dn": 65, "od": 76.1, "thickness": 4.0, "id_mm": 68.1, "remark": "单位:mm"},
-            {"id": "pipe_dn80", "name": "DN80", "category": "直管", "dn": 80, "od": 88.9, "thickness": 4.0, "id_mm": 80.9, "remark": "单位:mm"},
-            {"id": "pipe_dn100", "name": "DN100", "category": "直管", "dn": 100, "od": 114.3, "thickness": 4.5, "id_mm": 105.3, "remark": "单位:mm"},
-            # 弯头/弯管
-            {"id": "elbow45_long", "name": "45°长半径弯头", "category": "弯头", "angle": 45, "k": 0.20, "remark": "R≈1.5D"},
-            {"id": "elbow90_long", "name": "90°长半径弯头", "category": "弯头", "angle": 90, "k": 0.30, "remark": "R≈1.5D"},
-            {"id": "elbow90_short", "name": "90°短半径弯头", "category": "弯头", "angle": 90, "k": 0.45, "remark": "R≈1.0D"},
-            {"id": "elbow90_miter", "name": "90°直角弯头", "category": "弯头", "angle": 90, "k": 1.10, "remark": "R≈0"},
-            {"id": "elbow180_return", "name": "180°回弯头", "category": "弯头", "angle": 180, "k": 0.35, "remark": "R≈1.5D"},
-            {"id": "elbow60_bend", "name": "60°煨弯管", "category": "弯头", "angle": 60, "k": 0.15, "remark": "R≥3D"},
-            # 三通
-            {"id": "tee_equal", "name": "等径三通", "category": "三通", "spec": "Equal Tee", "k_run": 0.15, "k_branch": 0.85, "remark": "单位:mm, 主支管径一致"},
-            {"id": "tee_45_y", "name": "45°Y型三通", "category": "三通", "spec": "45° Y-Tee", "k_run": 0.12, "k_branch": 0.40, "remark": "单位:mm, 分流更顺畅"},
-            {"id": "tee_reducing", "name": "异径三通", "category": "三通", "spec": "Reducing Tee", "k_run": 0.20, "k_branch": 0.90, "remark": "单位:mm, 支管口径小于主管"},
-            # 变径
-            {"id": "reducer_concentric", "name": "同心渐缩管", "category": "渐缩", "spec": "Concentric Reducer", "angle": "≈15°", "k": 0.05, "remark": "水平/垂直管路通用"},
-            {"id": "reducer_eccentric", "name": "偏心渐缩管", "category": "渐缩", "spec": "Eccentric Reducer", "angle": "≈15°", "k": 0.06, "remark": "泵入口专用防气蚀"},
-            {"id": "reducer_sudden_con", "name": "突缩管", "category": "渐缩", "spec": "Sudden Contraction", "angle": "90°", "k": 0.50, "remark": "直接变径阻力大"},
-            {"id": "reducer_sudden_exp", "name": "突扩管", "category": "渐扩", "spec": "Sudden Expansion", "angle": "90°", "k": 1.00, "remark": "出口排入油箱类突扩"},
-            # 阀门
-            {"id": "valve_ball_dn25", "name": "球阀 DN25", "category": "阀门", "dn": 25, "Cv": 35, "Kv": 30, "resistance": "极低阻力", "remark": "Cv单位:gpm"},
-            {"id": "valve_ball_dn50", "name": "球阀 DN50", "category": "阀门", "dn": 50, "Cv": 180, "Kv": 155, "resistance": "极低阻力", "remark": "Cv单位:gpm"},
-            {"id": "valve_globe_dn25", "name": "截止阀 DN25", "category": "阀门", "dn": 25, "Cv": 13, "Kv": 11, "resistance": "高阻力", "remark": "Cv单位:gpm"},
-            {"id": "valve_globe_dn50", "name": "截止阀 DN50", "category": "阀门", "dn": 50, "Cv": 45, "Kv": 39, "resistance": "高阻力", "remark": "Cv单位:gpm"},
-            {"id": "valve_globe_dn80", "name": "截止阀 DN80", "category": "阀门", "dn": 80, "Cv": 110, "Kv": 95, "resistance": "高阻力", "remark": "Cv单位:gpm"},
-            {"id": "valve_butterfly_dn100", "name": "蝶阀 DN100", "category": "阀门", "dn": 100, "Cv": 350, "Kv": 300, "resistance": "中阻力", "remark": "Cv单位:gpm"},
-            {"id": "valve_check_dn25", "name": "单向阀 DN25", "category": "阀门", "dn": 25, "Cv": 15, "Kv": 13, "resistance": "中阻力", "remark": "Cv单位:gpm"},
-            {"id": "valve_check_dn50", "name": "单向阀 DN50", "category": "阀门", "dn": 50, "Cv": 55, "Kv": 47, "resistance": "中阻力", "remark": "Cv单位:gpm"},
-            # 泵 - 简化为两类
-            {"id": "pump_displacement", "name": "容积泵 (齿轮/螺杆)", "category": "泵", "pump_type": "gear", "flow": 1.5, "pressure": 250.0, "remark": "流量恒定, 压力随阻力变化"},
-            {"id": "pump_centrifugal", "name": "离心泵 (性能曲线)", "category": "泵", "pump_type": "curve", "flow": 10.0, "pressure": 500.0, "shutoff_pressure": 600.0, "remark": "流量随压力增加而减小"},
-            # 油品 (流体) - 仅保留三种特定油品
-            {"id": "oil_vg320", "name": "VG320 滑油", "category": "油品", "rho_15": 920.0, "v_40": 347.8, "v_100": 25.0, "remark": "密度920kg/m³, 40℃粘度0.32Pa·s"},
-            {"id": "oil_vg220", "name": "VG220 滑油", "category": "油品", "rho_15": 900.0, "v_40": 244.4, "v_100": 19.0, "remark": "密度900kg/m³, 40℃粘度0.22Pa·s"},
-            {"id": "oil_vg46", "name": "VG46 液压油", "category": "油品", "rho_15": 875.0, "v_40": 46.0, "v_100": 6.8, "remark": "常用轻质润滑油"},
-        ]
+        data = [dict(d) for d in _DEFAULT_FITTINGS]
+        for d in data:
+            _normalize_angle(d)
+        return data
 
     def _load(self):
-        if not os.path.exists(self.path):
-            self.data = self._default_data()
-            self.save()
+        # 文件未改动（修改时间与上次读/写一致）时直接复用内存数据，跳过解析
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns is not None and mtime_ns == self._mtime_ns:
             return
         try:
             with open(self.path, "r", encoding="utf-8") as f:
-                self.data = json.load(f)
-            if not isinstance(self.data, list):
-                self.data = self._default_data()
-        except Exception:
-            self.data = self._default_data()
-            self.save()
+                data = json.load(f)
+            if type(data) is not list:
+                raise ValueError("fittings.json 顶层必须为列表")
+        except FileNotFoundError:
+            self._reset_to_default()
+            return
+        except ValueError:
+            # 文件损坏：先备份原文件（带时间戳，不覆盖旧备份）再回退默认库，避免用户数据被静默覆盖
+            try:
+                os.replace(self.path, f"{self.path}.corrupt-{time.time_ns()}")
+            except OSError:
+                # 无法备份（只读目录/文件被占用）：不动原文件，仅在内存中使用默认库
+                self._use_default_in_memory()
+                return
+            self._reset_to_default()
+            return
+        except OSError:
+            # 读取失败（权限等）：仅在内存中使用默认库，不回写
+            self._use_default_in_memory()
+            return
+        # 手工编辑/部分损坏的文件中可能混有非字典条目，直接丢弃
+        data = [d for d in data if isinstance(d, dict)]
+        for d in data:
+            _normalize_angle(d)
+        self.data = data
+        self._rebuild_index()
+        self._rebuild_category()
+        self._mtime_ns = mtime_ns
+        self.revision += 1
+
+    def _use_default_in_memory(self):
+        self.data = self._default_data()
+        self._index = _DEFAULT_INDEX
+        self._rebuild_category()
+        self.revision += 1
+
+    def _reset_to_default(self):
+        self._use_default_in_memory()
+        self.save()
+
+    def _rebuild_index(self):
+        # id -> 下标；重复 id 以首个为准，与原线性查找行为一致
+        index = {}
+        for i, d in enumerate(self.data):
+            index.setdefault(d.get("id"), i)
+        self._index = index
+
+    def _rebuild_category(self):
+        by_cat = {}
+        for d in self.data:
+            by_cat.setdefault(d.get("category"), []).append(d)
+        self._by_category = by_cat
 
     def save(self):
+        payload = json.dumps(self.data, ensure_ascii=False, indent=2)
+        h = hash(payload)
+        # 内容与上次写入一致且文件仍在时跳过写盘
+        if h == self._last_saved_hash and os.path.exists(self.path):
+            return
         with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=2)
+            f.write(payload)
+        self._last_saved_hash = h
+        self._mtime_ns = os.stat(self.path).st_mtime_ns
 
     def all(self) -> List[Dict]:
         return list(self.data)
 
+    def iter_category(self, category: str) -> Sequence[Dict]:
+        """某一分类下的全部条目（只读，勿修改返回的序列）"""
+        return self._by_category.get(category, ())
+
     def upsert(self, item: Dict):
         # 保证 ID 存在
         if not item.get("id"):
             item["id"] = f"fit_{int(time.time() * 1000)}"
-        exists = False
-        for i, d in enumerate(self.data):
-            if d.get("id") == item["id"]:
-                self.data[i] = item
-                exists = True
-                break
-        if not exists:
+        _normalize_angle(item)
+        if self._index is _DEFAULT_INDEX:
+            # 首次修改时才从只读默认索引复制出可写索引
+            self._index = dict(_DEFAULT_INDEX)
+        i = self._index.get(item["id"])
+        if i is not None:
+            old = self.data[i]
+            self.data[i] = item
+            if old is not item and old.get("category") == item.get("category"):
+                # 分类不变：在分类列表中原位替换
+                bucket = self._by_category[old.get("category")]
+                bucket[next(j for j, d in enumerate(bucket) if d is old)] = item
+            else:
+                self._rebuild_category()
+        else:
+            self._index[item["id"]] = len(self.data)
             self.data.append(item)
+            self._by_category.setdefault(item.get("category"), []).append(item)
+        self.revision += 1
         self.save()
 
     def get(self, item_id: str) -> Dict:
-        for d in self.data:
-            if d.get("id") == item_id:
-                return d
-        return {}
+        i = self._index.get(item_id)
+        if i is None:
+            return {}
+        return self.data[i]
 
     def delete(self, item_id: str):
-        self.data = [d for d in self.data if d.get("id") != item_id]
+        kept = []
+        for d in self.data:
+            if d.get("id") != item_id:
+                kept.append(d)
+                continue
+            bucket = self._by_category.get(d.get("category"))
+            if bucket is not None:
+                bucket[:] = [b for b in bucket if b is not d]
+        self.data = kept
+        self._rebuild_index()
+        self.revision += 1
         self.save()
 
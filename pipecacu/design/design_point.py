@@ -0,0 +1,100 @@
+from typing import Dict
+
+# 点的已知字段及默认值，顺序即持久化到 JSON 的字段顺序（fluid_data 单独处理，默认空字典）
+_POINT_FIELDS = (
+    ("label", ""),
+    ("x", 0),
+    ("y", 0),
+    ("ptype", "normal"),
+    ("elevation", ""),
+    ("diameter", ""),
+    ("remark", ""),
+    ("fitting_id", ""),
+    ("fitting_name", ""),
+    ("fitting_k", ""),
+    ("fitting_angle", ""),
+    ("pump_type", "gear"),
+    ("pump_model", ""),
+    ("pump_head", ""),
+    ("pump_eff", ""),
+    ("pump_speed", ""),
+    ("pump_flow", ""),
+    ("pump_npsh", ""),
+    ("pump_in_dia", ""),
+    ("pump_out_dia", ""),
+    ("tee_angle", ""),
+    ("tee_ratio", ""),
+    ("tee_k", ""),
+    ("tee_main_dia", ""),
+    ("tee_branch_dia", ""),
+    ("valve_type", ""),
+    ("valve_dia", ""),
+    ("valve_open", ""),
+    ("valve_k", ""),
+)
+_FIELD_NAMES = tuple(name for name, _ in _POINT_FIELDS) + ("fluid_data",)
+_FIELD_SET = frozenset(_FIELD_NAMES)
+
+
+class DesignPoint:
+    """
+    画布上的点：固定字段存于 __slots__（无实例 __dict__），绘制与命中测试直接读属性。
+    保留 get / [] 访问以兼容按 dict 使用点数据的代码；未知字段放入 extras。
+    """
+
+    __slots__ = _FIELD_NAMES + ("extras",)
+
+    def __init__(self, **fields):
+        for name, default in _POINT_FIELDS:
+            setattr(self, name, fields.pop(name, default))
+        self.fluid_data = fields.pop("fluid_data", None) or {}
+        self.extras = fields
+
+    @classmethod
+    def from_dict(cls, data) -> "DesignPoint":
+        """由 dict 构造；传入 DesignPoint 时返回其副本"""
+        if isinstance(data, DesignPoint):
+            return data.copy()
+        return cls(**data)
+
+    def copy(self) -> "DesignPoint":
+        """浅拷贝（与 dict.copy 一致，fluid_data 等嵌套对象共享）"""
+        new = DesignPoint.__new__(DesignPoint)
+        for name in _FIELD_NAMES:
+            setattr(new, name, getattr(self, name))
+        new.extras = dict(self.extras)
+        return new
+
+    def to_dict(self, with_extras: bool = True) -> Dict:
+        """转为 JSON 持久化用的 dict；with_extras=False 时只含已知字段"""
+        d = {name: getattr(self, name) for name in _FIELD_NAMES}
+        if with_extras:
+            d.update(self.extras)
+        return d
+
+    def get(self, key: str, default=None):
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        return self.extras.get(key, default)
+
+    def __getitem__(self, key: str):
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        return self.extras[key]
+
+    def __setitem__(self, key: str, value):
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+        else:
+            self.extras[key] = value
+
+    def update(self, other: Dict):
+        """与 dict.update 相同：逐项写入字段"""
+        for key, value in other.items():
+            self[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in _FIELD_SET or key in self.extras
+
+    def __repr__(self) -> str:
+        return f"DesignPoint(label={self.label!r}, x={self.x!r}, y={self.y!r}, ptype={self.ptype!r})"
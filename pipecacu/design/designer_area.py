@@ -1,13 +1,95 @@
 from PyQt5 import QtWidgets, QtGui, QtCore, QtSvg
 import os
 import math
+from functools import lru_cache
+from types import MappingProxyType
+import numpy as np
 from datasystem.fittings_store import FittingsStore
 from .temporary_data import TemporaryData
+from .design_point import DesignPoint
+from .utils_jit import hit_line_np
+
+_ICON_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "assets", "leftsvg"))
+
+# 各点类型自有的属性字段；保存时其余类型的字段一律清空（由 _BLANK_FOR 一次写入）
+_PTYPE_FIELDS = {
+    "normal": frozenset(("fitting_id", "fitting_name", "fitting_k", "fitting_angle", "diameter")),
+    "pump": frozenset(("pump_model", "pump_head", "pump_speed", "pump_flow")),
+    "tee": frozenset(("tee_angle", "tee_ratio", "tee_k", "tee_main_dia", "tee_branch_dia")),
+    "valve": frozenset(("valve_type", "valve_dia", "valve_open", "valve_k")),
+    "tank": frozenset(),
+}
+_ALL_PTYPE_FIELDS = frozenset().union(*_PTYPE_FIELDS.values()) | {
+    "pump_eff", "pump_npsh", "pump_in_dia", "pump_out_dia",  # 泵表单中未使用的字段
+}
+_BLANK_FOR = {pt: dict.fromkeys(sorted(_ALL_PTYPE_FIELDS - owned), "") for pt, owned in _PTYPE_FIELDS.items()}
+
+# 下拉框未选择（itemData 为 None）时的只读空条目，取值统一走 .get 而无需先判空
+_EMPTY = MappingProxyType({})
+
+# 点类型与显示名称；顺序即类型下拉框选项顺序，也是表单堆栈的页序
+_PTYPE_DISPLAY = (("normal", "普通"), ("pump", "泵"), ("tee", "三通"), ("valve", "阀门"), ("tank", "油箱"))
+_PTYPE_TO_DISPLAY = {pt: txt for pt, txt in _PTYPE_DISPLAY}
+_DISPLAY_TO_PTYPE = {txt: pt for pt, txt in _PTYPE_DISPLAY}
+
+# 对话框下拉框的选项来源：键 -> (管件库分类, 显示文本格式化函数)
+_COMBO_SOURCES = {
+    "管件": (("弯头", "渐扩", "渐缩"), lambda it: f"{it.get('name','')} | K={it.get('k','')} | {it.get('angle','')}"),
+    "泵": (("泵",), lambda it: f"{it.get('name','')} | Q={it.get('flow','')} | P={it.get('pressure','')}"),
+    "三通": (("三通",), lambda it: f"{it.get('name','')} | 直:{it.get('k_run','')} 支:{it.get('k_branch','')}"),
+    "阀门": (("阀门",), lambda it: f"{it.get('name','')} | Cv={it.get('Cv','')} Kv={it.get('Kv','')}"),
+    "油品": (("油品",), lambda it: it["name"]),
+    "直管": (("直管",), lambda it: f"{it.get('name','')} | DN{it.get('dn','')} | ID={it.get('id_mm','')}"),
+}
+
+
+@lru_cache(maxsize=32)
+def _cached_svg(filenames: tuple, size: int, dpr: float):
+    """按 (候选文件名, 尺寸, DPR) 缓存渲染后的 SVG 图标，多个画板共享同一 QPixmap"""
+    for fn in filenames:
+        path = os.path.join(_ICON_DIR, fn)
+        if not os.path.exists(path):
+            continue
+        renderer = QtSvg.QSvgRenderer(path)
+        pix = QtGui.QPixmap(int(size * dpr), int(size * dpr))
+        pix.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(pix)
+        renderer.render(painter)
+        painter.end()
+        pix.setDevicePixelRatio(dpr)
+        return pix
+    return None
+
+
+@lru_cache(maxsize=512)
+def _text_path(font_key: str, text: str) -> QtGui.QPainterPath:
+    """缓存标签文字的轮廓路径（基线位于原点），避免每帧重新排版字形"""
+    font = QtGui.QFont()
+    font.fromString(font_key)
+    path = QtGui.QPainterPath()
+    path.addText(0, 0, font, text)
+    return path
+
+
+def _grow_cols(cols: np.ndarray, n: int) -> np.ndarray:
+    """保证坐标列缓冲 cols（形状 (k, 容量)）能写入第 n 列；容量不足时翻倍扩容并拷贝已有的 n 列"""
+    if n < cols.shape[1]:
+        return cols
+    grown = np.empty((cols.shape[0], max(16, n * 2)), dtype=np.float32)
+    grown[:, :n] = cols[:, :n]
+    return grown
 
 
 class GridWidget(QtWidgets.QWidget):
     """画板区域：绘制网格并支持缩放、取点"""
     data_changed = QtCore.pyqtSignal()  # 当数据（点、线）发生变化时触发
+    _PATTERN_CACHE = {}  # (dpr, step, w, h) -> QPixmap，所有画板实例共享
+    # 箭头模板：尖端位于原点、指向 +x（长 14，半角 25°），绘制时旋转平移到线段终点
+    _ARROW_TEMPLATE = QtGui.QPolygonF([
+        QtCore.QPointF(0, 0),
+        QtCore.QPointF(-14 * math.cos(math.radians(25)), 14 * math.sin(math.radians(25))),
+        QtCore.QPointF(-14 * math.cos(math.radians(25)), -14 * math.sin(math.radians(25))),
+    ])
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -17,8 +99,11 @@ class GridWidget(QtWidgets.QWidget):
         self._min_scale = 0.3
         self._max_scale = 4.0
         self._offset = QtCore.QPointF(0, 0)
+        # 逻辑坐标 -> 控件坐标的变换及其逆变换，随 _scale/_offset 更新
+        self._transform = QtGui.QTransform()
+        self._inv_transform = QtGui.QTransform()
         self._last_pos = None
-        self._points = []  # list of dict: {x,y,label,ptype}
+        self._points = []  # list of DesignPoint
         self.add_point_enabled = False
         self.drag_enabled = False
         self.delete_enabled = False
@@ -26,12 +111,36 @@ class GridWidget(QtWidgets.QWidget):
         self._point_radius = 10
         # 连线状态
         self.connect_enabled = False
-        self._start_point = None  # dict 与 _points 同结构，或 None
+        self._start_point = None  # DesignPoint（_points 中的元素）或 None
         self._temp_line = None  # {"start": (x,y), "end": (x,y)}
         self._lines = []  # {"start": (x,y), "end": (x,y), "label": "L1"}
         self._next_line_idx = 1
-        self._hover_point = None  # dict or None
+        self._hover_point = None  # DesignPoint or None
         self._hover_line = None   # index or None
+        # 悬停命中测试合并：移动事件只记录最新位置，下一轮事件循环统一计算一次
+        self._hover_pending = False
+        self._last_mouse_pos = None
+        # 重绘请求合并：同一轮事件中的多次请求只触发一次 update()
+        self._update_pending = False
+        # 命中测试用的坐标列（与 _points/_lines 下标一一对应）：按容量预留的缓冲，_px 等为其前 n 列的视图
+        self._pt_cols = np.empty((2, 0), dtype=np.float32)
+        self._ln_cols = np.empty((4, 0), dtype=np.float32)
+        self._px = self._py = np.empty(0, dtype=np.float32)
+        self._sx = self._sy = self._ex = self._ey = np.empty(0, dtype=np.float32)
+        # 空间哈希网格（格宽 2r）：(cx, cy) -> 点/线在 _points/_lines 中的下标列表，
+        # 用于落点重叠检查与命中测试的候选预筛；线登记在其经过的每个格子中
+        self._pt_grid = {}
+        self._line_grid = {}
+        # 点索引：label -> 点，(x, y) -> label
+        self._label_to_point = {}
+        self._xy_to_label = {}
+        self._backing = None  # 离屏绘制缓冲 QImage，尺寸/DPR 变化时重新分配
+        # 下拉框选项缓存：键 -> [(显示文本, 条目)]，管件库版本号变化时失效
+        self._combo_cache = {}
+        self._combo_cache_rev = None
+        self._point_dlg = None  # 点属性对话框，首次打开时创建，之后复用
+        self._line_dlg = None  # 线属性对话框，首次打开时创建，之后复用
+        self._build_styles()
         data_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "datasystem"))
         self.temp_data = TemporaryData(os.path.join(data_dir, "temporary_data.json"))
         self.fittings_store = FittingsStore(data_dir)
@@ -40,35 +149,31 @@ class GridWidget(QtWidgets.QWidget):
         self.tee_icon = self._load_svg_icon(["D_fittings.svg", "guanjian.svg", "Tee.svg"], 24)
         self.valve_icon = self._load_svg_icon(["valve.svg", "Valve.svg"], 24)
         self.tank_icon = self._load_svg_icon(["Yxiang.svg", "yxiang.svg"], 24)
+        self._icons = {"pump": self.pump_icon, "tee": self.tee_icon, "valve": self.valve_icon, "tank": self.tank_icon}
         # 初始化时加载已有数据
         self.load_from_temp()
 
     def _load_svg_icon(self, filename, size: int):
         try:
-            base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "assets", "leftsvg"))
-            candidates = filename if isinstance(filename, (list, tuple)) else [filename]
-            for fn in candidates:
-                path = os.path.join(base_dir, fn)
-                if not os.path.exists(path):
-                    continue
-                renderer = QtSvg.QSvgRenderer(path)
-                pix = QtGui.QPixmap(size, size)
-                pix.fill(QtCore.Qt.transparent)
-                painter = QtGui.QPainter(pix)
-                renderer.render(painter)
-                painter.end()
-                return pix
-            return None
+            candidates = tuple(filename) if isinstance(filename, (list, tuple)) else (filename,)
+            app = QtWidgets.QApplication.instance()
+            dpr = app.devicePixelRatio() if app else 1
+            return _cached_svg(candidates, size, dpr)
         except Exception:
             return None
 
-    def _build_pattern(self) -> QtGui.QPixmap:
+    @classmethod
+    def _build_pattern(cls) -> QtGui.QPixmap:
         # 放大纹理尺寸以提升清晰度，斜率 ±0.625，间距 14，保持与 React 网格比例一致
         w, h = 448,280  # 再放大一倍，提高清晰度，比例保持 224:140 的 4 倍
         step = 56
         m = 0.625
         app = QtWidgets.QApplication.instance()
         dpr = app.devicePixelRatio() if app else 1
+        key = (dpr, step, w, h)
+        cached = cls._PATTERN_CACHE.get(key)
+        if cached is not None:
+            return cached
         pix = QtGui.QPixmap(int(w * dpr), int(h * dpr))
         pix.fill(QtCore.Qt.transparent)
         painter = QtGui.QPainter(pix)
@@ -85,41 +190,85 @@ class GridWidget(QtWidgets.QWidget):
             painter.drawLine(QtCore.QPointF(x, h), QtCore.QPointF(x + w, h - m * w))
         painter.end()
         pix.setDevicePixelRatio(dpr)
+        cls._PATTERN_CACHE[key] = pix
         return pix
 
+    @classmethod
+    def invalidate_pattern_cache(cls):
+        """清空网格纹理缓存（如 DPR 变化后需重建）"""
+        cls._PATTERN_CACHE.clear()
+
+    def _build_styles(self):
+        """预先构建各类型点的画笔/画刷及悬停光晕颜色，绘制时按 ptype 直接取用"""
+        colors = {
+            "pump": ("#0d47a1", "#42a5f5"),
+            "tee": ("#e65100", "#ffb74d"),
+            "valve": ("#4a148c", "#ba68c8"),
+            "tank": ("#1565c0", "#64b5f6"),
+            "normal": ("#7CFC00", "#7CFC00"),
+        }
+        self._pens = {}
+        self._brushes = {}
+        self._glow_colors = {}
+        for ptype, (pen_color, brush_color) in colors.items():
+            base = QtGui.QColor(pen_color)
+            self._pens[ptype] = QtGui.QPen(base)
+            self._brushes[ptype] = QtGui.QBrush(QtGui.QColor(brush_color))
+            self._glow_colors[ptype] = (
+                QtGui.QColor(base.red(), base.green(), base.blue(), 150),
+                QtGui.QColor(base.red(), base.green(), base.blue(), 0),
+            )
+        self._text_brush = QtGui.QBrush(QtGui.QColor("#000000"))
+        self._origin_pen = QtGui.QPen(QtGui.QColor("#e53935"))
+        self._origin_brush = QtGui.QBrush(QtGui.QColor("#e53935"))
+        # 连线：线段/箭头统一深蓝，悬停时先画两层半透明粗笔触
+        line_color = QtGui.QColor("#0d47a1")
+        self._line_pen = QtGui.QPen(line_color)
+        self._line_pen.setWidthF(2.2)
+        self._line_brush = QtGui.QBrush(line_color)
+        self._line_glow_pens = []
+        for alpha, width in ((90, 10.0), (140, 7.0)):
+            glow_pen = QtGui.QPen(QtGui.QColor(13, 71, 161, alpha))
+            glow_pen.setWidthF(width)
+            glow_pen.setCapStyle(QtCore.Qt.RoundCap)
+            self._line_glow_pens.append(glow_pen)
+
     def set_points(self, pts):
         # 兼容旧格式 (x,y,label)
         norm = []
         for p in pts:
-            if isinstance(p, dict):
-                norm.append({
-                    "x": p.get("x", 0),
-                    "y": p.get("y", 0),
-                    "label": p.get("label", ""),
-                    "ptype": p.get("ptype", "normal")
-                })
+            if isinstance(p, (dict, DesignPoint)):
+                norm.append(DesignPoint(
+                    x=p.get("x", 0),
+                    y=p.get("y", 0),
+                    label=p.get("label", ""),
+                    ptype=p.get("ptype", "normal"),
+                ))
             else:
                 try:
                     x, y, label = p
-                    norm.append({"x": x, "y": y, "label": label, "ptype": "normal"})
+                    norm.append(DesignPoint(x=x, y=y, label=label, ptype="normal"))
                 except Exception:
                     continue
         self._points = norm
-        self.update()
+        self._rebuild_label_index()
+        self._rebuild_point_index()
+        self._rebuild_line_index()
+        self._request_update()
 
     def set_add_point_enabled(self, enabled: bool):
         self.add_point_enabled = enabled
-        self.update()
+        self._request_update()
 
     def set_drag_enabled(self, enabled: bool):
         self.drag_enabled = enabled
         if not enabled:
             self._last_pos = None
-        self.update()
+        self._request_update()
 
     def set_delete_enabled(self, enabled: bool):
         self.delete_enabled = enabled
-        self.update()
+        self._request_update()
 
     def set_point_type(self, ptype: str):
         self.current_point_type = ptype or "normal"
@@ -129,13 +278,14 @@ class GridWidget(QtWidgets.QWidget):
         if not enabled:
             self._start_point = None
             self._temp_line = None
-        self.update()
+        self._request_update()
 
     def load_from_temp(self):
         """从 TemporaryData 加载数据同步到画布"""
         data = self.temp_data.data
-        self._points = data.get("points", [])
-        
+        self._points = [DesignPoint.from_dict(p) for p in data.get("points", [])]
+        self._rebuild_label_index()
+
         # 将线数据从 label 格式转回坐标格式以便绘制
         new_lines = []
         max_line_idx = 0
@@ -146,8 +296,8 @@ class GridWidget(QtWidgets.QWidget):
             p_e = self._find_point_by_label(e_label)
             if p_s and p_e:
                 line_copy = ln.copy()
-                line_copy["start"] = (p_s["x"], p_s["y"])
-                line_copy["end"] = (p_e["x"], p_e["y"])
+                line_copy["start"] = (p_s.x, p_s.y)
+                line_copy["end"] = (p_e.x, p_e.y)
                 new_lines.append(line_copy)
                 # 更新下一个线的索引计数
                 try:
@@ -158,51 +308,226 @@ class GridWidget(QtWidgets.QWidget):
                     pass
         self._lines = new_lines
         self._next_line_idx = max_line_idx + 1
+        self._rebuild_point_index()
+        self._rebuild_line_index()
         self.data_changed.emit()
-        self.update()
+        self._request_update()
 
-    def _find_point_by_label(self, label: str):
+    def _remove_point(self, point: DesignPoint):
+        """删除点及其关联线：直接修改画布数据与索引，不再整体从 temp_data 重新加载"""
+        self.temp_data.delete_point(point.label)
+        xy = (point.x, point.y)
+        # 关联线的端点就在该点所在格子里，只需检查这一格登记的线
+        cell_key = self._cell_key(point.x, point.y)
+        while True:
+            for i in self._line_grid.get(cell_key, ()):
+                ln = self._lines[i]
+                if ln.get("start") == xy or ln.get("end") == xy:
+                    self._pop_line(i)
+                    break
+            else:
+                break
+        self._pop_point(next(i for i in self._pt_grid[cell_key] if self._points[i] is point))
+        self._rebuild_label_index()
+        self._after_remove()
+
+    def _remove_line(self, idx: int):
+        self.temp_data.delete_line(self._lines[idx].get("label"))
+        self._pop_line(idx)
+        self._after_remove()
+
+    def _after_remove(self):
+        # 下标已变化，悬停/连线起点状态一并清空
+        self._hover_point = None
+        self._hover_line = None
+        self._start_point = None
+        self._temp_line = None
+        self.data_changed.emit()
+        self._request_update()
+
+    @staticmethod
+    def _xy_key(x: float, y: float):
+        return round(x, 6), round(y, 6)
+
+    def _rebuild_label_index(self):
+        self._label_to_point = {}
+        self._xy_to_label = {}
         for p in self._points:
-            if p.get("label") == label:
-                return p
-        return None
+            self._index_point_label(p)
+
+    def _index_point_label(self, p: DesignPoint):
+        # 重复 label/坐标时以先出现者为准，与线性查找一致
+        self._label_to_point.setdefault(p.label, p)
+        self._xy_to_label.setdefault(self._xy_key(p.x, p.y), p.label)
+
+    def _find_point_by_label(self, label: str):
+        return self._label_to_point.get(label)
+
+    # 坐标列用 float32（画布坐标在 ±8000 内，精度足够），内存带宽与 SIMD 宽度均为 float64 的两倍；
+    # 点本身的坐标仍为 Python float，持久化不受影响。
+    # 整批载入时重建坐标列与网格；新增点线只追加一列并登记格子，删除用交换删除（末尾元素移入空位）。
+    def _rebuild_point_index(self):
+        pts = self._points
+        n = len(pts)
+        cols = np.empty((2, max(16, n)), dtype=np.float32)
+        cols[0, :n] = np.fromiter((p.x for p in pts), dtype=np.float32, count=n)
+        cols[1, :n] = np.fromiter((p.y for p in pts), dtype=np.float32, count=n)
+        self._pt_cols = cols
+        self._pt_grid = {}
+        for i, p in enumerate(pts):
+            self._pt_grid.setdefault(self._cell_key(p.x, p.y), []).append(i)
+        self._sync_point_cols()
+
+    def _rebuild_line_index(self):
+        lines = self._lines
+        n = len(lines)
+        cols = np.empty((4, max(16, n)), dtype=np.float32)
+        for k, (end, axis) in enumerate((("start", 0), ("start", 1), ("end", 0), ("end", 1))):
+            cols[k, :n] = np.fromiter((ln.get(end, (0, 0))[axis] for ln in lines), dtype=np.float32, count=n)
+        self._ln_cols = cols
+        self._line_grid = {}
+        for i, ln in enumerate(lines):
+            for key in self._line_cells(ln):
+                self._line_grid.setdefault(key, []).append(i)
+        self._sync_line_cols()
+
+    def _append_point(self, p: DesignPoint):
+        # 新点写入坐标列的第 n 列并登记到所在格子，再加入 _points
+        n = len(self._points)
+        self._pt_cols = _grow_cols(self._pt_cols, n)
+        self._pt_cols[0, n] = p.x
+        self._pt_cols[1, n] = p.y
+        self._pt_grid.setdefault(self._cell_key(p.x, p.y), []).append(n)
+        self._points.append(p)
+        self._sync_point_cols()
+
+    def _append_line(self, ln: dict):
+        n = len(self._lines)
+        self._ln_cols = _grow_cols(self._ln_cols, n)
+        (sx, sy), (ex, ey) = ln["start"], ln["end"]
+        self._ln_cols[:, n] = (sx, sy, ex, ey)
+        for key in self._line_cells(ln):
+            self._line_grid.setdefault(key, []).append(n)
+        self._lines.append(ln)
+        self._sync_line_cols()
+
+    def _pop_point(self, i: int):
+        pts = self._points
+        last = len(pts) - 1
+        p = pts[i]
+        self._pt_grid[self._cell_key(p.x, p.y)].remove(i)
+        if i != last:
+            q = pts[last]
+            cell = self._pt_grid[self._cell_key(q.x, q.y)]
+            cell[cell.index(last)] = i
+            pts[i] = q
+            self._pt_cols[:, i] = self._pt_cols[:, last]
+        pts.pop()
+        self._sync_point_cols()
+
+    def _pop_line(self, i: int):
+        lines = self._lines
+        last = len(lines) - 1
+        for key in self._line_cells(lines[i]):
+            self._line_grid[key].remove(i)
+        if i != last:
+            moved = lines[last]
+            for key in self._line_cells(moved):
+                cell = self._line_grid[key]
+                cell[cell.index(last)] = i
+            lines[i] = moved
+            self._ln_cols[:, i] = self._ln_cols[:, last]
+        lines.pop()
+        self._sync_line_cols()
+
+    def _sync_point_cols(self):
+        n = len(self._points)
+        self._px = self._pt_cols[0, :n]
+        self._py = self._pt_cols[1, :n]
+
+    def _sync_line_cols(self):
+        n = len(self._lines)
+        self._sx, self._sy, self._ex, self._ey = self._ln_cols[:, :n]
+
+    def _cell_key(self, x: float, y: float):
+        cell = self._point_radius * 2
+        return int(x // cell), int(y // cell)
+
+    def _line_cells(self, ln: dict):
+        """线段经过的全部格子：逐列求 y 范围，不遗漏对角穿越的格子；两端点所在格总在其中"""
+        cell = self._point_radius * 2
+        (x0, y0), (x1, y1) = ln.get("start", (0, 0)), ln.get("end", (0, 0))
+        cells = {self._cell_key(x0, y0), self._cell_key(x1, y1)}
+        if x0 > x1:
+            x0, y0, x1, y1 = x1, y1, x0, y0
+        dx = x1 - x0
+        for cx in range(int(x0 // cell), int(x1 // cell) + 1):
+            if dx == 0:
+                ya, yb = y0, y1
+            else:
+                ya = y0 + (max(x0, cx * cell) - x0) * (y1 - y0) / dx
+                yb = y0 + (min(x1, (cx + 1) * cell) - x0) * (y1 - y0) / dx
+            if ya > yb:
+                ya, yb = yb, ya
+            for cy in range(int(ya // cell), int(yb // cell) + 1):
+                cells.add((cx, cy))
+        return cells
+
+    def _grid_candidates(self, grid: dict, x: float, y: float, reach: float) -> np.ndarray:
+        """(x, y) 周围 reach 范围内各格登记的下标（升序，距离相同时与线性扫描取同一个）"""
+        n = int(math.ceil(reach / (self._point_radius * 2)))
+        cx, cy = self._cell_key(x, y)
+        found = set()
+        for gx in range(cx - n, cx + n + 1):
+            for gy in range(cy - n, cy + n + 1):
+                found.update(grid.get((gx, gy), ()))
+        return np.fromiter(sorted(found), dtype=np.intp, count=len(found))
+
+    def _overlaps_point(self, x: float, y: float) -> bool:
+        """(x, y) 与已有点距离是否小于 2r；格宽即 2r，只需检查周围 9 个格子"""
+        threshold = self._point_radius * 2
+        thr2 = threshold * threshold
+        pts = self._points
+        cx, cy = self._cell_key(x, y)
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for i in self._pt_grid.get((gx, gy), ()):
+                    p = pts[i]
+                    if (p.x - x) ** 2 + (p.y - y) ** 2 < thr2:
+                        return True
+        return False
 
     def _hit_point(self, x: float, y: float):
+        # 先由网格取出附近的候选点，再对候选下标做 float32 向量化计算
         thr = self._point_radius * 1.1
-        thr2 = thr * thr
-        for p in self._points:
-            dx = p.get("x", 0) - x
-            dy = p.get("y", 0) - y
-            if dx * dx + dy * dy <= thr2:
-                return p
-        return None
+        idx = self._grid_candidates(self._pt_grid, x, y, thr)
+        if not len(idx):
+            return None
+        x, y = np.float32(x), np.float32(y)
+        d2 = (self._px[idx] - x) ** 2 + (self._py[idx] - y) ** 2
+        j = int(np.argmin(d2))
+        return self._points[idx[j]] if d2[j] <= thr * thr else None
 
     def _hit_line(self, x: float, y: float, threshold: float = 10.0):
-        best_idx = None
-        best_dist2 = None
-        for i, ln in enumerate(self._lines):
-            s = ln.get("start", (0, 0))
-            e = ln.get("end", (0, 0))
-            dist2 = self._point_to_segment_dist2(x, y, s, e)
-            if dist2 <= threshold * threshold:
-                if best_dist2 is None or dist2 < best_dist2:
-                    best_dist2 = dist2
-                    best_idx = i
-        return best_idx
+        idx = self._grid_candidates(self._line_grid, x, y, threshold)
+        if not len(idx):
+            return None
+        j = hit_line_np(np.float32(x), np.float32(y), self._sx[idx], self._sy[idx], self._ex[idx], self._ey[idx],
+                        np.float32(threshold * threshold))
+        return int(idx[j]) if j >= 0 else None
 
     @staticmethod
-    def _point_to_segment_dist2(px, py, s, e):
-        sx, sy = s
-        ex, ey = e
-        dx = ex - sx
-        dy = ey - sy
-        if dx == 0 and dy == 0:
-            return (px - sx) ** 2 + (py - sy) ** 2
-        t = ((px - sx) * dx + (py - sy) * dy) / (dx * dx + dy * dy)
-        t = max(0.0, min(1.0, t))
-        proj_x = sx + t * dx
-        proj_y = sy + t * dy
-        return (px - proj_x) ** 2 + (py - proj_y) ** 2
+    def _draw_label(painter: QtGui.QPainter, font_key: str, text: str, x: float, y: float, brush: QtGui.QBrush):
+        # 以 (x, y) 为基线起点填充缓存的文字路径
+        painter.translate(x, y)
+        painter.fillPath(_text_path(font_key, text), brush)
+        painter.translate(-x, -y)
+
+    @staticmethod
+    def _draw_icon(painter: QtGui.QPainter, icon: QtGui.QPixmap, x: float, y: float):
+        # 图标带 DPR，按逻辑尺寸居中
+        dpr = icon.devicePixelRatio()
+        painter.drawPixmap(QtCore.QPointF(x - icon.width() / (2 * dpr), y - icon.height() / (2 * dpr)), icon)
 
     def _draw_arrow_line(self, painter: QtGui.QPainter, start: tuple, end: tuple, color: str = "#0d47a1"):
         """绘制带箭头的线段，颜色统一深蓝。"""
@@ -211,159 +536,135 @@ class GridWidget(QtWidgets.QWidget):
         pen.setWidthF(2.2)
         painter.setPen(pen)
         painter.setBrush(line_color)
-        s_pt = QtCore.QPointF(*start)
-        e_pt = QtCore.QPointF(*end)
-        painter.drawLine(s_pt, e_pt)
-        # 箭头
-        angle = math.atan2(end[1] - start[1], end[0] - start[0])
-        arrow_len = 14
-        arrow_ang = math.radians(25)
-        p1 = QtCore.QPointF(
-            end[0] - arrow_len * math.cos(angle - arrow_ang),
-            end[1] - arrow_len * math.sin(angle - arrow_ang),
-        )
-        p2 = QtCore.QPointF(
-            end[0] - arrow_len * math.cos(angle + arrow_ang),
-            end[1] - arrow_len * math.sin(angle + arrow_ang),
-        )
-        painter.drawPolygon(QtGui.QPolygonF([e_pt, p1, p2]))
+        painter.drawLine(QtCore.QPointF(*start), QtCore.QPointF(*end))
+        painter.save()
+        painter.translate(end[0], end[1])
+        painter.rotate(math.degrees(math.atan2(end[1] - start[1], end[0] - start[0])))
+        painter.drawPolygon(self._ARROW_TEMPLATE)
+        painter.restore()
+
+    @classmethod
+    def _arrow_polygon(cls, start: tuple, end: tuple) -> QtGui.QPolygonF:
+        """线段终点处的箭头三角形（由模板旋转平移得到，供批量拼入 QPainterPath）"""
+        t = QtGui.QTransform()
+        t.translate(end[0], end[1])
+        t.rotate(math.degrees(math.atan2(end[1] - start[1], end[0] - start[0])))
+        return t.map(cls._ARROW_TEMPLATE)
+
+    def _update_inv_transform(self):
+        """_scale 或 _offset 变化后重建坐标变换（与 paintEvent 中 painter 的变换一致）"""
+        t = QtGui.QTransform()
+        t.scale(self._scale, self._scale)
+        t.translate(self._offset.x(), self._offset.y())
+        self._transform = t
+        self._inv_transform = t.inverted()[0]
 
     def wheelEvent(self, event: QtGui.QWheelEvent):
         delta = event.angleDelta().y()
         factor = 1.1 if delta > 0 else 1 / 1.1
         new_scale = max(self._min_scale, min(self._max_scale, self._scale * factor))
         self._scale = new_scale
-        self.update()
+        self._update_inv_transform()
+        self._request_update()
 
     def mousePressEvent(self, event: QtGui.QMouseEvent):
         if self.drag_enabled and event.button() == QtCore.Qt.LeftButton:
             self._last_pos = QtCore.QPointF(event.pos())
             return
         if self.delete_enabled and event.button() == QtCore.Qt.LeftButton:
-            x = (event.x() / self._scale) - self._offset.x()
-            y = (event.y() / self._scale) - self._offset.y()
+            pos = self._inv_transform.map(event.localPos())
+            x, y = pos.x(), pos.y()
             hit_p = self._hit_point(x, y)
             if hit_p:
-                label = hit_p.get("label")
-                self.temp_data.delete_point(label)
-                # 重新加载本地数据以保持同步
-                self.load_from_temp()
+                self._remove_point(hit_p)
                 return
             hit_l_idx = self._hit_line(x, y)
             if hit_l_idx is not None:
-                label = self._lines[hit_l_idx].get("label")
-                self.temp_data.delete_line(label)
-                self.load_from_temp()
+                self._remove_line(hit_l_idx)
             return
         if self.add_point_enabled and event.button() == QtCore.Qt.LeftButton:
-            x = (event.x() / self._scale) - self._offset.x()
-            y = (event.y() / self._scale) - self._offset.y()
+            pos = self._inv_transform.map(event.localPos())
+            x, y = pos.x(), pos.y()
             # 防止与现有点重合/相交
-            threshold = self._point_radius * 2
-            for p in self._points:
-                dx = p.get("x", 0) - x
-                dy = p.get("y", 0) - y
-                if (dx * dx + dy * dy) < (threshold * threshold):
-                    return  # 太近则忽略落点
+            if self._overlaps_point(x, y):
+                return  # 太近则忽略落点
             label = f"P{len(self._points) + 1}"
-            new_point = {
-                "x": x,
-                "y": y,
-                "label": label,
-                "ptype": self.current_point_type,
-                "diameter": "",
-                "remark": "",
-                "fitting_id": "",
-                "fitting_name": "",
-                "fitting_k": "",
-                "fitting_angle": "",
-                "pump_model": "",
-                "pump_head": "",
-                "pump_eff": "",
-                "pump_speed": "",
-                "pump_flow": "",
-                "pump_npsh": "",
-                "pump_in_dia": "",
-                "pump_out_dia": "",
-                "tee_angle": "",
-                "tee_ratio": "",
-                "tee_k": "",
-                "tee_main_dia": "",
-                "tee_branch_dia": "",
-                "valve_type": "",
-                "valve_dia": "",
-                "valve_open": "",
-                "valve_k": "",
-            }
-            self._points.append(new_point)
+            new_point = DesignPoint(x=x, y=y, label=label, ptype=self.current_point_type)
+            self._append_point(new_point)
+            self._index_point_label(new_point)
             self._persist_point(new_point)
             self.data_changed.emit()
-            self.update()
+            self._request_update()
             return
         if self.connect_enabled and event.button() == QtCore.Qt.LeftButton:
-            x = (event.x() / self._scale) - self._offset.x()
-            y = (event.y() / self._scale) - self._offset.y()
+            pos = self._inv_transform.map(event.localPos())
+            x, y = pos.x(), pos.y()
             hit = self._hit_point(x, y)
             if self._start_point is None:
                 if hit is None:
                     return
                 self._start_point = hit
                 self._temp_line = None
-                self.update()
+                self._request_update()
                 return
             # 已有起点时，按下不立即落线，等待 mouseRelease
             return
         # 记录 hover（点击时也更新）
-        x = (event.x() / self._scale) - self._offset.x()
-        y = (event.y() / self._scale) - self._offset.y()
+        pos = self._inv_transform.map(event.localPos())
+        x, y = pos.x(), pos.y()
         self._update_hover(x, y)
 
     def mouseMoveEvent(self, event: QtGui.QMouseEvent):
-        x = (event.x() / self._scale) - self._offset.x()
-        y = (event.y() / self._scale) - self._offset.y()
+        pos = self._inv_transform.map(event.localPos())
+        x, y = pos.x(), pos.y()
         if self.drag_enabled and self._last_pos is not None and event.buttons() & QtCore.Qt.LeftButton:
             delta = QtCore.QPointF(event.pos()) - self._last_pos
             self._offset += delta / self._scale
+            self._update_inv_transform()
             self._last_pos = QtCore.QPointF(event.pos())
-            self.update()
+            self._request_update()
         if self.connect_enabled and self._start_point is not None:
-            sx, sy = self._start_point.get("x", 0), self._start_point.get("y", 0)
+            sx, sy = self._start_point.x, self._start_point.y
             self._temp_line = {"start": (sx, sy), "end": (x, y)}
-            self.update()
-        self._update_hover(x, y)
+            self._request_update()
+        self._last_mouse_pos = (x, y)
+        if not self._hover_pending:
+            self._hover_pending = True
+            QtCore.QTimer.singleShot(0, self._flush_hover)
 
     def mouseReleaseEvent(self, event: QtGui.QMouseEvent):
         if self.drag_enabled and event.button() == QtCore.Qt.LeftButton:
             self._last_pos = None
         if self.connect_enabled and event.button() == QtCore.Qt.LeftButton and self._start_point is not None:
-            x = (event.x() / self._scale) - self._offset.x()
-            y = (event.y() / self._scale) - self._offset.y()
+            pos = self._inv_transform.map(event.localPos())
+            x, y = pos.x(), pos.y()
             hit = self._hit_point(x, y)
             if hit is not None and hit is not self._start_point:
-                start = (self._start_point.get("x", 0), self._start_point.get("y", 0))
-                end = (hit.get("x", 0), hit.get("y", 0))
-                # 去重（无向）
-                for ln in self._lines:
+                start = (self._start_point.x, self._start_point.y)
+                end = (hit.x, hit.y)
+                # 去重（无向）：重复的线必以起点为端点，只需检查起点所在格子登记的线
+                for i in self._line_grid.get(self._cell_key(*start), ()):
+                    ln = self._lines[i]
                     s = ln.get("start")
                     e = ln.get("end")
                     if (s == start and e == end) or (s == end and e == start):
                         self._start_point = None
                         self._temp_line = None
-                        self.update()
+                        self._request_update()
                         return
                 label = f"L{self._next_line_idx}"
                 self._next_line_idx += 1
                 new_line = {"start": start, "end": end, "label": label, "diameter": "", "length": "", "remark": ""}
-                self._lines.append(new_line)
+                self._append_line(new_line)
                 self._persist_line(new_line)
                 self.data_changed.emit()
             self._start_point = None
             self._temp_line = None
-        self.update()
+        self._request_update()
 
     def mouseDoubleClickEvent(self, event: QtGui.QMouseEvent):
-        x = (event.x() / self._scale) - self._offset.x()
-        y = (event.y() / self._scale) - self._offset.y()
+        pos = self._inv_transform.map(event.localPos())
+        x, y = pos.x(), pos.y()
         hit_point = self._hit_point(x, y)
         if hit_point:
             self._open_point_dialog(hit_point)
@@ -373,110 +674,161 @@ class GridWidget(QtWidgets.QWidget):
             self._open_line_dialog(line_idx)
 
     def leaveEvent(self, event: QtCore.QEvent):
+        self._last_mouse_pos = None  # 丢弃尚未处理的悬停计算
         self._hover_point = None
         self._hover_line = None
-        self.update()
+        self._request_update()
         super().leaveEvent(event)
 
+    def _ensure_backing(self):
+        """按控件尺寸与 DPR 分配离屏 QImage（Qt 原生预乘格式，贴图时无需格式转换）"""
+        dpr = self.devicePixelRatioF()
+        backing = self._backing
+        if backing is not None and backing.devicePixelRatio() == dpr and backing.size() == self.size() * dpr:
+            return backing
+        backing = QtGui.QImage(self.size() * dpr, QtGui.QImage.Format_ARGB32_Premultiplied)
+        backing.setDevicePixelRatio(dpr)
+        backing.fill(self.palette().color(self.backgroundRole()))
+        self._backing = backing
+        return backing
+
     def paintEvent(self, event: QtGui.QPaintEvent) -> None:
+        # 只在离屏图像上重绘本次脏区域，再整体贴到控件（控件绘制区域已被裁剪为脏区域）
+        backing = self._ensure_backing()
+        rect = event.rect()
+        painter = QtGui.QPainter(backing)
+        painter.setClipRect(rect)
+        painter.fillRect(rect, self.palette().brush(self.backgroundRole()))
+        self._render(painter, rect)
+        painter.end()
         painter = QtGui.QPainter(self)
+        painter.drawImage(0, 0, backing)
+        painter.end()
+
+    def _render(self, painter: QtGui.QPainter, rect: QtCore.QRect):
+        """在 painter 上绘制 rect（控件坐标）范围内的网格、点与连线"""
+        painter.setTransform(self._transform, True)
+        # 网格只平铺当前可见区域（重绘区域映射回逻辑坐标），覆盖范围仍限定在 ±8000 内；
+        # 纹理本身已抗锯齿，背景平铺无需开启 Antialiasing
+        view = painter.transform().inverted()[0].mapRect(QtCore.QRectF(rect))
+        visible = view.intersected(QtCore.QRectF(-8000, -8000, 16000, 16000))
+        if not visible.isEmpty():
+            tile_w = self._pattern.width() / self._pattern.devicePixelRatio()
+            tile_h = self._pattern.height() / self._pattern.devicePixelRatio()
+            # 偏移取模使纹理仍以逻辑原点对齐，与原先 QBrush 平铺一致
+            painter.drawTiledPixmap(visible, self._pattern, QtCore.QPointF(visible.x() % tile_w, visible.y() % tile_h))
         painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
-        painter.scale(self._scale, self._scale)
-        painter.translate(self._offset)
-        brush = QtGui.QBrush(self._pattern)
-        # 扩大网格覆盖范围（更大的可视区域，网格数量更多）
-        painter.fillRect(QtCore.QRectF(-8000, -8000, 16000, 16000), brush)
 
         # 原点标记（红色）
-        origin_pen = QtGui.QPen(QtGui.QColor("#e53935"))
-        origin_brush = QtGui.QBrush(QtGui.QColor("#e53935"))
-        painter.setPen(origin_pen)
-        painter.setBrush(origin_brush)
+        painter.setPen(self._origin_pen)
+        painter.setBrush(self._origin_brush)
         painter.drawEllipse(QtCore.QPointF(0, 0), 8, 8)
 
-        # 取点
+        # 取点：按类型分桶，相同画笔/画刷的图元批量绘制，减少状态切换
         font = painter.font()
         font.setPixelSize(18)
         painter.setFont(font)
+        font_key = font.toString()
+        radius = self._point_radius
+        # 视口裁剪：可见逻辑区域外扩（兼顾光晕、图标与右上方标签），区域外的点/线不绘制
+        margin = radius * 6
+        vx0, vy0 = view.left() - margin, view.top() - margin
+        vx1, vy1 = view.right() + margin, view.bottom() + margin
+        hover = self._hover_point
+        hover_visible = False
+        buckets = {}
+        visible_pts = []
         for p in self._points:
-            x = p.get("x", 0)
-            y = p.get("y", 0)
-            label = p.get("label", "")
-            ptype = p.get("ptype", "normal")
-            if ptype == "pump":
-                pen = QtGui.QPen(QtGui.QColor("#0d47a1"))
-                brush = QtGui.QBrush(QtGui.QColor("#42a5f5"))
-            elif ptype == "tee":
-                pen = QtGui.QPen(QtGui.QColor("#e65100"))
-                brush = QtGui.QBrush(QtGui.QColor("#ffb74d"))
-            elif ptype == "valve":
-                pen = QtGui.QPen(QtGui.QColor("#4a148c"))
-                brush = QtGui.QBrush(QtGui.QColor("#ba68c8"))
-            elif ptype == "tank":
-                pen = QtGui.QPen(QtGui.QColor("#1565c0"))
-                brush = QtGui.QBrush(QtGui.QColor("#64b5f6"))
-            else:
-                pen = QtGui.QPen(QtGui.QColor("#7CFC00"))
-                brush = QtGui.QBrush(QtGui.QColor("#7CFC00"))
-            is_hover = (p is self._hover_point)
-            if is_hover:
-                # 渐变发散型微光
-                grad = QtGui.QRadialGradient(QtCore.QPointF(x, y), self._point_radius * 2.2)
-                base = pen.color()
-                center_color = QtGui.QColor(base.red(), base.green(), base.blue(), 150)
-                edge_color = QtGui.QColor(base.red(), base.green(), base.blue(), 0)
-                grad.setColorAt(0.0, center_color)
-                grad.setColorAt(1.0, edge_color)
-                painter.setPen(QtCore.Qt.NoPen)
-                painter.setBrush(QtGui.QBrush(grad))
-                painter.drawEllipse(QtCore.QPointF(x, y), self._point_radius * 2.2, self._point_radius * 2.2)
-            painter.setPen(pen)
-            painter.setBrush(brush)
-            r = 10
-            # 特殊类型用透明圆，视觉由图标替代；普通点保持绿色圆
-            if ptype == "normal":
-                painter.drawEllipse(QtCore.QPointF(x, y), self._point_radius, self._point_radius)
-            else:
-                painter.setBrush(QtCore.Qt.NoBrush)
-                painter.setPen(QtCore.Qt.NoPen)
-                painter.drawEllipse(QtCore.QPointF(x, y), self._point_radius, self._point_radius)
-            painter.setPen(QtGui.QColor("#000000"))  # 文本黑色
-            painter.drawText(QtCore.QPointF(x + 12, y - 12), label)
-            # 覆盖图标
-            if ptype == "pump" and self.pump_icon:
-                painter.drawPixmap(QtCore.QPointF(x - self.pump_icon.width() / 2, y - self.pump_icon.height() / 2), self.pump_icon)
-            if ptype == "tee" and self.tee_icon:
-                painter.drawPixmap(QtCore.QPointF(x - self.tee_icon.width() / 2, y - self.tee_icon.height() / 2), self.tee_icon)
-            if ptype == "valve" and self.valve_icon:
-                painter.drawPixmap(QtCore.QPointF(x - self.valve_icon.width() / 2, y - self.valve_icon.height() / 2), self.valve_icon)
-            if ptype == "tank" and self.tank_icon:
-                painter.drawPixmap(QtCore.QPointF(x - self.tank_icon.width() / 2, y - self.tank_icon.height() / 2), self.tank_icon)
+            if p is hover:
+                hover_visible = True
+            x = p.x
+            y = p.y
+            if not (vx0 <= x <= vx1 and vy0 <= y <= vy1):
+                continue
+            visible_pts.append(p)
+            buckets.setdefault(p.ptype, []).append(p)
+        if hover_visible:
+            # 渐变发散型微光
+            hx, hy = hover.x, hover.y
+            center_color, edge_color = self._glow_colors.get(hover.ptype, self._glow_colors["normal"])
+            grad = QtGui.QRadialGradient(QtCore.QPointF(hx, hy), radius * 2.2)
+            grad.setColorAt(0.0, center_color)
+            grad.setColorAt(1.0, edge_color)
+            painter.setPen(QtCore.Qt.NoPen)
+            painter.setBrush(QtGui.QBrush(grad))
+            painter.drawEllipse(QtCore.QPointF(hx, hy), radius * 2.2, radius * 2.2)
+        # 普通点为绿色实心圆；其余类型的圆透明，视觉由图标替代
+        normal_pts = buckets.get("normal")
+        if normal_pts:
+            painter.setPen(self._pens["normal"])
+            painter.setBrush(self._brushes["normal"])
+            for p in normal_pts:
+                painter.drawEllipse(QtCore.QPointF(p.x, p.y), radius, radius)
+        for p in visible_pts:
+            self._draw_label(painter, font_key, p.label, p.x + 12, p.y - 12, self._text_brush)  # 文本黑色
+        # 覆盖图标
+        for ptype, pts in buckets.items():
+            icon = self._icons.get(ptype)
+            if not icon:
+                continue
+            for p in pts:
+                self._draw_icon(painter, icon, p.x, p.y)
+
         # 连线（先画已落线，再画预览线）
-        for idx, ln in enumerate(self._lines):
-            s = ln.get("start", (0, 0))
-            e = ln.get("end", (0, 0))
-            is_hover_line = (self._hover_line == idx)
-            if is_hover_line:
-                # 渐变发散型微光：先绘制粗透明笔触
-                glow_pen = QtGui.QPen(QtGui.QColor(13, 71, 161, 90))
-                glow_pen.setWidthF(10.0)
-                glow_pen.setCapStyle(QtCore.Qt.RoundCap)
+        lines = self._lines
+        if self._hover_line is not None and 0 <= self._hover_line < len(lines):
+            # 渐变发散型微光：先绘制粗透明笔触
+            ln = lines[self._hover_line]
+            s_pt = QtCore.QPointF(*ln.get("start", (0, 0)))
+            e_pt = QtCore.QPointF(*ln.get("end", (0, 0)))
+            for glow_pen in self._line_glow_pens:
                 painter.setPen(glow_pen)
-                painter.drawLine(QtCore.QPointF(*s), QtCore.QPointF(*e))
-                glow_pen2 = QtGui.QPen(QtGui.QColor(13, 71, 161, 140))
-                glow_pen2.setWidthF(7.0)
-                glow_pen2.setCapStyle(QtCore.Qt.RoundCap)
-                painter.setPen(glow_pen2)
-                painter.drawLine(QtCore.QPointF(*s), QtCore.QPointF(*e))
-            self._draw_arrow_line(painter, s, e, "#0d47a1")
-            mx = (s[0] + e[0]) / 2
-            my = (s[1] + e[1]) / 2
-            painter.drawText(QtCore.QPointF(mx + 6, my - 6), ln.get("label", ""))
+                painter.drawLine(s_pt, e_pt)
+        visible_lines = []
+        for ln in lines:
+            (sx, sy), (ex, ey) = ln.get("start", (0, 0)), ln.get("end", (0, 0))
+            # 包围盒与可见区域不相交则跳过
+            if max(sx, ex) < vx0 or min(sx, ex) > vx1 or max(sy, ey) < vy0 or min(sy, ey) > vy1:
+                continue
+            visible_lines.append(ln)
+        lines = visible_lines
+        if lines:
+            painter.setPen(self._line_pen)
+            painter.setBrush(self._line_brush)
+            segments = []
+            # 箭头同向旋转，方向一致，WindingFill 下重叠处不会镂空
+            arrows = QtGui.QPainterPath()
+            arrows.setFillRule(QtCore.Qt.WindingFill)
+            for ln in lines:
+                s = ln.get("start", (0, 0))
+                e = ln.get("end", (0, 0))
+                segments.append(QtCore.QLineF(QtCore.QPointF(*s), QtCore.QPointF(*e)))
+                arrows.addPolygon(self._arrow_polygon(s, e))
+                arrows.closeSubpath()
+            painter.drawLines(segments)
+            painter.drawPath(arrows)
+            for ln in lines:
+                s = ln.get("start", (0, 0))
+                e = ln.get("end", (0, 0))
+                self._draw_label(painter, font_key, ln.get("label", ""), (s[0] + e[0]) / 2 + 6, (s[1] + e[1]) / 2 - 6, self._line_brush)
         if self._temp_line:
             s = self._temp_line["start"]
             e = self._temp_line["end"]
             self._draw_arrow_line(painter, s, e, "#0d47a1")
-        painter.end()
+
+    def _request_update(self):
+        if not self._update_pending:
+            self._update_pending = True
+            QtCore.QTimer.singleShot(0, self._do_update)
+
+    def _do_update(self):
+        self._update_pending = False
+        QtWidgets.QWidget.update(self)
+
+    def _flush_hover(self):
+        self._hover_pending = False
+        if self._last_mouse_pos is not None:
+            self._update_hover(*self._last_mouse_pos)
 
     def _update_hover(self, x: float, y: float):
         prev_point = self._hover_point
@@ -487,41 +839,26 @@ class GridWidget(QtWidgets.QWidget):
         else:
             self._hover_line = None
         if self._hover_point is not prev_point or self._hover_line != prev_line:
-            self.update()
+            # 只重绘悬停前后两个图元所在区域，其余部分保持不变
+            for rect in (self._hover_rect(prev_point, prev_line), self._hover_rect(self._hover_point, self._hover_line)):
+                if rect is not None:
+                    self.update(rect)
 
-    def _persist_point(self, point: dict):
-        base = {
-            "label": point.get("label", ""),
-            "x": point.get("x", 0),
-            "y": point.get("y", 0),
-            "ptype": point.get("ptype", "normal"),
-            "elevation": point.get("elevation", ""),
-            "diameter": point.get("diameter", ""),
-            "remark": point.get("remark", ""),
-            "fitting_id": point.get("fitting_id", ""),
-            "fitting_name": point.get("fitting_name", ""),
-            "fitting_k": point.get("fitting_k", ""),
-            "fitting_angle": point.get("fitting_angle", ""),
-            "pump_model": point.get("pump_model", ""),
-            "pump_head": point.get("pump_head", ""),
-            "pump_eff": point.get("pump_eff", ""),
-            "pump_speed": point.get("pump_speed", ""),
-            "pump_flow": point.get("pump_flow", ""),
-            "pump_npsh": point.get("pump_npsh", ""),
-            "pump_in_dia": point.get("pump_in_dia", ""),
-            "pump_out_dia": point.get("pump_out_dia", ""),
-            "tee_angle": point.get("tee_angle", ""),
-            "tee_ratio": point.get("tee_ratio", ""),
-            "tee_k": point.get("tee_k", ""),
-            "tee_main_dia": point.get("tee_main_dia", ""),
-            "tee_branch_dia": point.get("tee_branch_dia", ""),
-            "valve_type": point.get("valve_type", ""),
-            "valve_dia": point.get("valve_dia", ""),
-            "valve_open": point.get("valve_open", ""),
-            "valve_k": point.get("valve_k", ""),
-            "fluid_data": point.get("fluid_data", {}),
-        }
-        self.temp_data.upsert_point(base)
+    def _hover_rect(self, point, line_idx):
+        """悬停光晕覆盖的控件坐标区域；无悬停对象时返回 None"""
+        if point is not None:
+            r = self._point_radius * 2.2 + 2
+            logical = QtCore.QRectF(point.x - r, point.y - r, 2 * r, 2 * r)
+        elif line_idx is not None and 0 <= line_idx < len(self._lines):
+            ln = self._lines[line_idx]
+            (sx, sy), (ex, ey) = ln.get("start", (0, 0)), ln.get("end", (0, 0))
+            logical = QtCore.QRectF(QtCore.QPointF(sx, sy), QtCore.QPointF(ex, ey)).normalized().adjusted(-8, -8, 8, 8)
+        else:
+            return None
+        return self._transform.mapRect(logical).toAlignedRect().adjusted(-1, -1, 1, 1)
+
+    def _persist_point(self, point: DesignPoint):
+        self.temp_data.upsert_point(point.to_dict(with_extras=False))
 
     def _persist_line(self, line: dict):
         base = {
@@ -538,183 +875,173 @@ class GridWidget(QtWidgets.QWidget):
         if coord is None:
             return ""
         x, y = coord
+        label = self._xy_to_label.get(self._xy_key(x, y))
+        if label is not None:
+            return label
+        # 未命中时回退线性查找（兼容舍入边界附近的旧数据）
         for p in self._points:
-            if abs(p.get("x", 0) - x) < 1e-6 and abs(p.get("y", 0) - y) < 1e-6:
-                return p.get("label", "")
+            if abs(p.x - x) < 1e-6 and abs(p.y - y) < 1e-6:
+                return p.label
         return ""
 
-    def _open_point_dialog(self, point: dict):
+    def _combo_entries(self, key: str):
+        """下拉框选项 [(显示文本, 条目)]；管件库数据未变化时直接复用上次的结果"""
+        rev = self.fittings_store.revision
+        if rev != self._combo_cache_rev:
+            self._combo_cache = {}
+            self._combo_cache_rev = rev
+        entries = self._combo_cache.get(key)
+        if entries is None:
+            categories, fmt = _COMBO_SOURCES[key]
+            if len(categories) == 1:
+                items = self.fittings_store.iter_category(categories[0])
+            else:
+                # 跨多个分类时保持管件库中的原有顺序
+                items = [it for it in self.fittings_store.all() if it.get("category", "") in categories]
+            entries = self._combo_cache[key] = [(fmt(it), it) for it in items]
+        return entries
+
+    def _open_point_dialog(self, point: DesignPoint):
         # 实时从文件重新加载管件库，确保在对话框中能看到最新添加的管件
         self.fittings_store._load()
-        
-        dlg = QtWidgets.QDialog(self)
-        dlg.resize(450, 450)
-        dlg.setWindowTitle(point.get("label", "点"))
-        layout = QtWidgets.QVBoxLayout(dlg)
+
+        if self._point_dlg is None:
+            self._point_dlg = _PointDialog(self)
+        entries = {key: self._combo_entries(key) for key in ("管件", "泵", "三通", "阀门", "油品")}
+        if self._point_dlg.edit(point, entries):
+            self._persist_point(point)
+            self._request_update()
+
+    def _open_line_dialog(self, idx: int):
+        if idx < 0 or idx >= len(self._lines):
+            return
+
+        # 实时从文件重新加载管件库
+        self.fittings_store._load()
+
+        line = self._lines[idx]
+        if self._line_dlg is None:
+            self._line_dlg = _LineDialog(self)
+        endpoints = f"{self._find_point_label(line.get('start'))} -> {self._find_point_label(line.get('end'))}"
+        if self._line_dlg.edit(line, endpoints, self._combo_entries("直管")):
+            self._persist_line(line)
+            self._request_update()
+
+    def _show_info_dialog(self, title: str):
+        # 已废弃，保留接口占位
+        msg = QtWidgets.QMessageBox(self)
+        msg.setWindowTitle(title or "")
+        msg.setText("")
+        msg.setStandardButtons(QtWidgets.QMessageBox.Ok | QtWidgets.QMessageBox.Cancel)
+        msg.exec_()
+
+    def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
+        # 使网格中心与画布中心对齐；原地更新已有的 _offset，不再每次新建 QPointF
+        inv = 0.5 / self._scale
+        self._offset.setX(-self.width() * inv)
+        self._offset.setY(-self.height() * inv)
+        self._update_inv_transform()
+        self._ensure_backing()
+        super().resizeEvent(event)
+
+
+class _PointDialog(QtWidgets.QDialog):
+    """点属性对话框：五个类型表单的控件只创建一次，每次编辑时重置内容后复用"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._point = None
+        self._entries = {}  # 下拉框键 -> 当前填充所用的选项列表
+        self.resize(450, 450)
+        layout = QtWidgets.QVBoxLayout(self)
         form_top = QtWidgets.QFormLayout()
-        lbl_label = QtWidgets.QLabel(point.get("label", ""))
-        lbl_coord = QtWidgets.QLabel(f"({point.get('x', 0):.2f}, {point.get('y', 0):.2f})")
-        def _ptype_to_display(pt):
-            return {"normal": "普通", "pump": "泵", "tee": "三通", "valve": "阀门", "tank": "油箱"}.get(pt, "普通")
-
-        def _display_to_ptype(txt):
-            return {"普通": "normal", "泵": "pump", "三通": "tee", "阀门": "valve", "油箱": "tank"}.get(txt, "normal")
-
-        type_box = QtWidgets.QComboBox()
-        type_box.addItems(["普通", "泵", "三通", "阀门", "油箱"])
-        type_box.setCurrentText(_ptype_to_display(point.get("ptype", "normal")))
-        elevation_edit = QtWidgets.QLineEdit(str(point.get("elevation", "")))
-        form_top.addRow("标签", lbl_label)
-        form_top.addRow("坐标", lbl_coord)
-        form_top.addRow("类型", type_box)
-        form_top.addRow("高度(m)", elevation_edit)
+        self.lbl_label = QtWidgets.QLabel()
+        self.lbl_coord = QtWidgets.QLabel()
+        self.type_box = QtWidgets.QComboBox()
+        self.type_box.addItems([txt for _, txt in _PTYPE_DISPLAY])
+        self.elevation_edit = QtWidgets.QLineEdit()
+        form_top.addRow("标签", self.lbl_label)
+        form_top.addRow("坐标", self.lbl_coord)
+        form_top.addRow("类型", self.type_box)
+        form_top.addRow("高度(m)", self.elevation_edit)
         layout.addLayout(form_top)
 
-        stack = QtWidgets.QStackedWidget()
+        self.stack = QtWidgets.QStackedWidget()
         # normal form
         normal_widget = QtWidgets.QWidget()
         normal_form = QtWidgets.QFormLayout(normal_widget)
-        fittings_combo = QtWidgets.QComboBox()
-        fittings_combo.addItem("（不选择）", userData=None)
-        for item in self.fittings_store.all():
-            cat = item.get("category", "")
-            if cat in ("弯头", "渐扩", "渐缩"):
-                text = f"{item.get('name','')} | K={item.get('k','')} | {item.get('angle','')}"
-                fittings_combo.addItem(text, userData=item)
-        diameter_edit = QtWidgets.QLineEdit(str(point.get("diameter", "")))
-        remark_edit_n = QtWidgets.QLineEdit(str(point.get("remark", "")))
-        normal_form.addRow("管件", fittings_combo)
-        normal_form.addRow("备注", remark_edit_n)
-        # 预选当前管件
-        current_fid = point.get("fitting_id", "")
-        if current_fid:
-            for idx in range(fittings_combo.count()):
-                data = fittings_combo.itemData(idx)
-                if data and data.get("id") == current_fid:
-                    fittings_combo.setCurrentIndex(idx)
-                    break
+        self.fittings_combo = QtWidgets.QComboBox()
+        self.remark_edit_n = QtWidgets.QLineEdit()
+        normal_form.addRow("管件", self.fittings_combo)
+        normal_form.addRow("备注", self.remark_edit_n)
 
         # pump form
         pump_widget = QtWidgets.QWidget()
         pump_form = QtWidgets.QFormLayout(pump_widget)
-        pump_combo = QtWidgets.QComboBox()
-        pump_combo.addItem("（不选择）", userData=None)
-        for item in self.fittings_store.all():
-            if item.get("category") == "泵":
-                txt = f"{item.get('name','')} | Q={item.get('flow','')} | P={item.get('pressure','')}"
-                pump_combo.addItem(txt, userData=item)
-                if point.get("pump_type") == item.get("pump_type") and point.get("pump_flow") == item.get("flow"):
-                    pump_combo.setCurrentIndex(pump_combo.count() - 1)
-        
-        pump_type_combo = QtWidgets.QComboBox()
-        pump_type_combo.addItems(["容积泵 (齿轮/螺杆)", "离心泵 (性能曲线)"])
-        
-        pump_flow = QtWidgets.QLineEdit(str(point.get("pump_flow", ""))) # m3/h
-        pump_head = QtWidgets.QLineEdit(str(point.get("pump_head", ""))) # kPa
-        pump_shutoff = QtWidgets.QLineEdit(str(point.get("pump_speed", ""))) # kPa (离心泵关死扬程)
-        remark_edit_p = QtWidgets.QLineEdit(str(point.get("remark", "")))
-        
-        pump_form.addRow("数据库选型", pump_combo)
-        pump_form.addRow("计算类型", pump_type_combo)
-        pump_form.addRow("设定流量(m³/h)", pump_flow)
-        pump_form.addRow("设定压力/扬程(kPa)", pump_head)
-        pump_form.addRow("关死压力(kPa, 仅离心泵)", pump_shutoff)
-        pump_form.addRow("备注", remark_edit_p)
-
-        def on_pump_selected(idx):
-            data = pump_combo.itemData(idx)
-            if data:
-                pump_flow.setText(str(data.get("flow", "")))
-                pump_head.setText(str(data.get("pressure", "")))
-                pump_shutoff.setText(str(data.get("shutoff_pressure", "")))
-                if data.get("pump_type") == "curve":
-                    pump_type_combo.setCurrentIndex(1)
-                else:
-                    pump_type_combo.setCurrentIndex(0)
-
-        pump_combo.currentIndexChanged.connect(on_pump_selected)
-        # 初始化类型选择
-        if point.get("pump_type") == "curve":
-            pump_type_combo.setCurrentIndex(1)
-        else:
-            pump_type_combo.setCurrentIndex(0)
+        self.pump_combo = QtWidgets.QComboBox()
+        self.pump_type_combo = QtWidgets.QComboBox()
+        self.pump_type_combo.addItems(["容积泵 (齿轮/螺杆)", "离心泵 (性能曲线)"])
+        self.pump_flow = QtWidgets.QLineEdit()  # m3/h
+        self.pump_head = QtWidgets.QLineEdit()  # kPa
+        self.pump_shutoff = QtWidgets.QLineEdit()  # kPa (离心泵关死扬程)
+        self.remark_edit_p = QtWidgets.QLineEdit()
+        pump_form.addRow("数据库选型", self.pump_combo)
+        pump_form.addRow("计算类型", self.pump_type_combo)
+        pump_form.addRow("设定流量(m³/h)", self.pump_flow)
+        pump_form.addRow("设定压力/扬程(kPa)", self.pump_head)
+        pump_form.addRow("关死压力(kPa, 仅离心泵)", self.pump_shutoff)
+        pump_form.addRow("备注", self.remark_edit_p)
 
         # tee form
         tee_widget = QtWidgets.QWidget()
         tee_form = QtWidgets.QFormLayout(tee_widget)
-        tee_combo = QtWidgets.QComboBox()
-        tee_combo.addItem("（不选择）", userData=None)
-        for item in self.fittings_store.all():
-            if item.get("category") == "三通":
-                txt = f"{item.get('name','')} | 直:{item.get('k_run','')} 支:{item.get('k_branch','')}"
-                tee_combo.addItem(txt, userData=item)
-                if point.get("tee_angle") and str(point.get("tee_angle")) == str(item.get("spec", "")):
-                    tee_combo.setCurrentIndex(tee_combo.count() - 1)
-        tee_angle = QtWidgets.QLineEdit(str(point.get("tee_angle", "")))
-        tee_ratio = QtWidgets.QLineEdit(str(point.get("tee_ratio", "")))
-        tee_k = QtWidgets.QLineEdit(str(point.get("tee_k", "")))
-        tee_main_dia = QtWidgets.QLineEdit(str(point.get("tee_main_dia", "")))
-        tee_branch_dia = QtWidgets.QLineEdit(str(point.get("tee_branch_dia", "")))
-        remark_edit_t = QtWidgets.QLineEdit(str(point.get("remark", "")))
-        tee_form.addRow("选型", tee_combo)
-        tee_form.addRow("主干直径(mm)", tee_main_dia)
-        tee_form.addRow("支管直径(mm)", tee_branch_dia)
-        tee_form.addRow("分支角度(°)", tee_angle)
-        tee_form.addRow("分流比例(%)", tee_ratio)
-        tee_form.addRow("局阻系数K", tee_k)
-        tee_form.addRow("备注", remark_edit_t)
+        self.tee_combo = QtWidgets.QComboBox()
+        self.tee_angle = QtWidgets.QLineEdit()
+        self.tee_ratio = QtWidgets.QLineEdit()
+        self.tee_k = QtWidgets.QLineEdit()
+        self.tee_main_dia = QtWidgets.QLineEdit()
+        self.tee_branch_dia = QtWidgets.QLineEdit()
+        self.remark_edit_t = QtWidgets.QLineEdit()
+        tee_form.addRow("选型", self.tee_combo)
+        tee_form.addRow("主干直径(mm)", self.tee_main_dia)
+        tee_form.addRow("支管直径(mm)", self.tee_branch_dia)
+        tee_form.addRow("分支角度(°)", self.tee_angle)
+        tee_form.addRow("分流比例(%)", self.tee_ratio)
+        tee_form.addRow("局阻系数K", self.tee_k)
+        tee_form.addRow("备注", self.remark_edit_t)
 
         # valve form
         valve_widget = QtWidgets.QWidget()
         valve_form = QtWidgets.QFormLayout(valve_widget)
-        valve_combo = QtWidgets.QComboBox()
-        valve_combo.addItem("（不选择）", userData=None)
-        for item in self.fittings_store.all():
-            if item.get("category") == "阀门":
-                txt = f"{item.get('name','')} | Cv={item.get('Cv','')} Kv={item.get('Kv','')}"
-                valve_combo.addItem(txt, userData=item)
-                if point.get("valve_type") and str(point.get("valve_type")) == str(item.get("name", "")):
-                    valve_combo.setCurrentIndex(valve_combo.count() - 1)
-        valve_type = QtWidgets.QLineEdit(str(point.get("valve_type", "")))
-        valve_dia = QtWidgets.QLineEdit(str(point.get("valve_dia", "")))
-        valve_open = QtWidgets.QLineEdit(str(point.get("valve_open", "")))
-        valve_k = QtWidgets.QLineEdit(str(point.get("valve_k", "")))
-        remark_edit_v = QtWidgets.QLineEdit(str(point.get("remark", "")))
-        valve_form.addRow("选型", valve_combo)
-        valve_form.addRow("阀型", valve_type)
-        valve_form.addRow("口径(mm)", valve_dia)
-        valve_form.addRow("开度(%)", valve_open)
-        valve_form.addRow("流量系数(Cv/Kv)", valve_k)
-        valve_form.addRow("备注", remark_edit_v)
+        self.valve_combo = QtWidgets.QComboBox()
+        self.valve_type = QtWidgets.QLineEdit()
+        self.valve_dia = QtWidgets.QLineEdit()
+        self.valve_open = QtWidgets.QLineEdit()
+        self.valve_k = QtWidgets.QLineEdit()
+        self.remark_edit_v = QtWidgets.QLineEdit()
+        valve_form.addRow("选型", self.valve_combo)
+        valve_form.addRow("阀型", self.valve_type)
+        valve_form.addRow("口径(mm)", self.valve_dia)
+        valve_form.addRow("开度(%)", self.valve_open)
+        valve_form.addRow("流量系数(Cv/Kv)", self.valve_k)
+        valve_form.addRow("备注", self.remark_edit_v)
 
         # tank form (油箱选择油品)
         tank_widget = QtWidgets.QWidget()
         tank_form = QtWidgets.QFormLayout(tank_widget)
-        oil_combo = QtWidgets.QComboBox()
-        all_items = self.fittings_store.all()
-        oils = [it for it in all_items if it.get("category") == "油品"]
-        for o in oils:
-            oil_combo.addItem(o["name"], o)
-        
-        # 预选当前油品
-        current_fluid_name = point.get("fluid_data", {}).get("name", "")
-        if current_fluid_name:
-            idx = oil_combo.findText(current_fluid_name)
-            if idx >= 0: oil_combo.setCurrentIndex(idx)
-        
+        self.oil_combo = QtWidgets.QComboBox()
         tank_pressure = QtWidgets.QLabel("101.325 kPa (大气压)")
-        remark_edit_tank = QtWidgets.QLineEdit(str(point.get("remark", "")))
-        
-        tank_form.addRow("仿真油品选择", oil_combo)
+        self.remark_edit_tank = QtWidgets.QLineEdit()
+        tank_form.addRow("仿真油品选择", self.oil_combo)
         tank_form.addRow("液面压力", tank_pressure)
-        tank_form.addRow("备注", remark_edit_tank)
+        tank_form.addRow("备注", self.remark_edit_tank)
 
-        stack.addWidget(normal_widget)  # index 0 normal
-        stack.addWidget(pump_widget)    # index 1 pump
-        stack.addWidget(tee_widget)     # index 2 tee
-        stack.addWidget(valve_widget)   # index 3 valve
-        stack.addWidget(tank_widget)    # index 4 tank
-        layout.addWidget(stack)
+        self.stack.addWidget(normal_widget)  # index 0 normal
+        self.stack.addWidget(pump_widget)    # index 1 pump
+        self.stack.addWidget(tee_widget)     # index 2 tee
+        self.stack.addWidget(valve_widget)   # index 3 valve
+        self.stack.addWidget(tank_widget)    # index 4 tank
+        layout.addWidget(self.stack)
 
         btn_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
         ok_btn = btn_box.button(QtWidgets.QDialogButtonBox.Ok)
@@ -731,145 +1058,197 @@ class GridWidget(QtWidgets.QWidget):
             cancel_btn.setStyleSheet("background:#d9d9d9; color:#333; border:none; padding:6px 12px; border-radius:4px;")
         layout.addWidget(btn_box)
 
-        def switch_form(ptype: str):
-            if ptype == "pump":
-                stack.setCurrentIndex(1)
-            elif ptype == "tee":
-                stack.setCurrentIndex(2)
-            elif ptype == "valve":
-                stack.setCurrentIndex(3)
-            elif ptype == "tank":
-                stack.setCurrentIndex(4)
-            else:
-                stack.setCurrentIndex(0)
+        # 类型下拉框与表单堆栈页序一致，直接连到 setCurrentIndex，信号不经过 Python 函数
+        self.type_box.currentIndexChanged.connect(self.stack.setCurrentIndex)
+        self.pump_combo.currentIndexChanged.connect(self._on_pump_selected)
+        self.tee_combo.currentIndexChanged.connect(self._on_tee_selected)
+        self.valve_combo.currentIndexChanged.connect(self._on_valve_selected)
+        btn_box.accepted.connect(self._on_accept)
+        btn_box.rejected.connect(self.reject)
 
-        def _fill_pump(item):
-            if not item:
-                return
-            pump_model.setText(str(item.get("model", "")))
-            pump_flow.setText(str(item.get("flow", "")))
-            pump_head.setText(str(item.get("pressure", "")))
-            remark_edit_p.setText(str(item.get("remark", "")))
+    def _set_entries(self, combo: QtWidgets.QComboBox, key: str, entries, blank: bool = True):
+        # 选项列表未变化（仍是同一缓存对象）时保留已有条目，不重建
+        if entries is self._entries.get(key):
+            return
+        combo.clear()
+        if blank:
+            combo.addItem("（不选择）", userData=None)
+        for txt, item in entries:
+            combo.addItem(txt, userData=item)
+        self._entries[key] = entries
 
-        def _fill_tee(item):
-            if not item:
-                return
-            tee_angle.setText(str(item.get("spec", "")))
-            tee_k.setText(str(item.get("k_branch", "")))
-            tee_ratio.setText(str(item.get("k_run", "")))
-            remark_edit_t.setText(str(item.get("remark", "")))
+    def edit(self, point: DesignPoint, entries) -> bool:
+        """以 point 的当前值重置各表单并模态显示；确定时已写回 point，返回 True。
+        entries: 下拉框键（管件/泵/三通/阀门/油品）-> [(显示文本, 条目)]"""
+        self._point = point
+        get = point.get
+        self.setWindowTitle(get("label", "点"))
+        self.lbl_label.setText(get("label", ""))
+        self.lbl_coord.setText(f"({get('x', 0):.2f}, {get('y', 0):.2f})")
+        self.type_box.setCurrentText(_PTYPE_TO_DISPLAY.get(get("ptype", "normal"), "普通"))
+        self.stack.setCurrentIndex(self.type_box.currentIndex())
+        self.elevation_edit.setText(str(get("elevation", "")))
+        remark = str(get("remark", ""))
+        for edit in (self.remark_edit_n, self.remark_edit_p, self.remark_edit_t, self.remark_edit_v,
+                     self.remark_edit_tank):
+            edit.setText(remark)
+        self.pump_flow.setText(str(get("pump_flow", "")))
+        self.pump_head.setText(str(get("pump_head", "")))
+        self.pump_shutoff.setText(str(get("pump_speed", "")))
+        self.tee_angle.setText(str(get("tee_angle", "")))
+        self.tee_ratio.setText(str(get("tee_ratio", "")))
+        self.tee_k.setText(str(get("tee_k", "")))
+        self.tee_main_dia.setText(str(get("tee_main_dia", "")))
+        self.tee_branch_dia.setText(str(get("tee_branch_dia", "")))
+        self.valve_type.setText(str(get("valve_type", "")))
+        self.valve_dia.setText(str(get("valve_dia", "")))
+        self.valve_open.setText(str(get("valve_open", "")))
+        self.valve_k.setText(str(get("valve_k", "")))
 
-        def _fill_valve(item):
-            if not item:
-                return
-            valve_type.setText(str(item.get("name", "")))
-            valve_dia.setText(str(item.get("dn", "")))
-            valve_k.setText(str(item.get("Kv", "")))
-            remark_edit_v.setText(str(item.get("remark", "")))
-
-        switch_form(_display_to_ptype(type_box.currentText()))
-        type_box.currentTextChanged.connect(lambda txt: switch_form(_display_to_ptype(txt)))
-        tee_combo.currentIndexChanged.connect(lambda idx: _fill_tee(tee_combo.itemData(idx)))
-        valve_combo.currentIndexChanged.connect(lambda idx: _fill_valve(valve_combo.itemData(idx)))
-
-        def on_accept():
-            ptype = _display_to_ptype(type_box.currentText())
-            point["ptype"] = ptype
-            point["elevation"] = elevation_edit.text().strip()
-            if ptype == "normal":
-                data = fittings_combo.currentData()
-                point["fitting_id"] = data.get("id", "") if data else ""
-                point["fitting_name"] = data.get("name", "") if data else ""
-                point["fitting_k"] = data.get("k", "") if data else ""
-                point["fitting_angle"] = data.get("angle", "") if data else ""
-                point["remark"] = remark_edit_n.text().strip()
-                point["pump_model"] = point["pump_head"] = point["pump_eff"] = point["pump_speed"] = ""
-                point["pump_flow"] = point["pump_npsh"] = point["pump_in_dia"] = point["pump_out_dia"] = ""
-                point["tee_angle"] = point["tee_ratio"] = point["tee_k"] = ""
-                point["tee_main_dia"] = point["tee_branch_dia"] = ""
-                point["valve_type"] = point["valve_dia"] = point["valve_open"] = point["valve_k"] = ""
-            elif ptype == "pump":
-                point["pump_type"] = "curve" if pump_type_combo.currentIndex() == 1 else "gear"
-                point["pump_flow"] = pump_flow.text().strip()
-                point["pump_head"] = pump_head.text().strip()
-                point["pump_speed"] = pump_shutoff.text().strip() # 借用 speed 存离心泵关死压力
-                point["remark"] = remark_edit_p.text().strip()
-                
-                point["fitting_id"] = point["fitting_name"] = point["fitting_k"] = point["fitting_angle"] = ""
-                point["pump_eff"] = point["pump_npsh"] = point["pump_in_dia"] = point["pump_out_dia"] = ""
-                point["tee_angle"] = point["tee_ratio"] = point["tee_k"] = ""
-                point["tee_main_dia"] = point["tee_branch_dia"] = ""
-                point["diameter"] = ""
-                point["valve_type"] = point["valve_dia"] = point["valve_open"] = point["valve_k"] = ""
-            elif ptype == "tee":
-                data = tee_combo.currentData()
-                if data:
-                    point["tee_angle"] = str(data.get("spec", ""))
-                    point["tee_ratio"] = str(data.get("k_run", ""))
-                    point["tee_k"] = str(data.get("k_branch", ""))
-                    point["remark"] = data.get("remark", "")
-                else:
-                    point["tee_angle"] = tee_angle.text().strip()
-                    point["tee_ratio"] = tee_ratio.text().strip()
-                    point["tee_k"] = tee_k.text().strip()
-                point["tee_angle"] = tee_angle.text().strip()
-                point["tee_ratio"] = tee_ratio.text().strip()
-                point["tee_k"] = tee_k.text().strip()
-                point["tee_main_dia"] = tee_main_dia.text().strip()
-                point["tee_branch_dia"] = tee_branch_dia.text().strip()
-                point["remark"] = remark_edit_t.text().strip()
-                point["fitting_id"] = point["fitting_name"] = point["fitting_k"] = point["fitting_angle"] = ""
-                point["pump_model"] = point["pump_head"] = point["pump_eff"] = point["pump_speed"] = ""
-                point["pump_flow"] = point["pump_npsh"] = point["pump_in_dia"] = point["pump_out_dia"] = ""
-                point["diameter"] = ""
-                point["valve_type"] = point["valve_dia"] = point["valve_open"] = point["valve_k"] = ""
-            elif ptype == "tank":
-                point["fluid_data"] = oil_combo.currentData()
-                point["remark"] = remark_edit_tank.text().strip()
-                # 清理其他类型数据
-                point["fitting_id"] = point["fitting_name"] = point["fitting_k"] = point["fitting_angle"] = ""
-                point["pump_model"] = point["pump_head"] = point["pump_eff"] = point["pump_speed"] = ""
-                point["pump_flow"] = point["pump_npsh"] = point["pump_in_dia"] = point["pump_out_dia"] = ""
-                point["tee_angle"] = point["tee_ratio"] = point["tee_k"] = ""
-                point["tee_main_dia"] = point["tee_branch_dia"] = ""
-                point["diameter"] = ""
-                point["valve_type"] = point["valve_dia"] = point["valve_open"] = point["valve_k"] = ""
-            self._persist_point(point)
-            self.update()
-            dlg.accept()
+        # 预选不应触发选型回调改写刚重置的字段
+        combos = (self.fittings_combo, self.pump_combo, self.tee_combo, self.valve_combo, self.oil_combo)
+        for combo in combos:
+            combo.blockSignals(True)
+        self._set_entries(self.fittings_combo, "管件", entries["管件"])
+        self._set_entries(self.pump_combo, "泵", entries["泵"])
+        self._set_entries(self.tee_combo, "三通", entries["三通"])
+        self._set_entries(self.valve_combo, "阀门", entries["阀门"])
+        self._set_entries(self.oil_combo, "油品", entries["油品"], blank=False)
 
-        btn_box.accepted.connect(on_accept)
-        btn_box.rejected.connect(dlg.reject)
-        dlg.exec_()
+        # 预选当前管件（首个匹配）
+        idx = 0
+        current_fid = get("fitting_id", "")
+        if current_fid:
+            for i, (_, item) in enumerate(entries["管件"], start=1):
+                if item.get("id") == current_fid:
+                    idx = i
+                    break
+        self.fittings_combo.setCurrentIndex(idx)
+        # 泵/三通/阀门：与逐项添加时的预选一致，以最后一个匹配为准
+        idx = 0
+        for i, (_, item) in enumerate(entries["泵"], start=1):
+            if get("pump_type") == item.get("pump_type") and get("pump_flow") == item.get("flow"):
+                idx = i
+        self.pump_combo.setCurrentIndex(idx)
+        self.pump_type_combo.setCurrentIndex(1 if get("pump_type") == "curve" else 0)
+        idx = 0
+        tee_spec = get("tee_angle")
+        if tee_spec:
+            for i, (_, item) in enumerate(entries["三通"], start=1):
+                if str(tee_spec) == str(item.get("spec", "")):
+                    idx = i
+        self.tee_combo.setCurrentIndex(idx)
+        idx = 0
+        valve_name = get("valve_type")
+        if valve_name:
+            for i, (_, item) in enumerate(entries["阀门"], start=1):
+                if str(valve_name) == str(item.get("name", "")):
+                    idx = i
+        self.valve_combo.setCurrentIndex(idx)
+        # 预选当前油品，未选过时为第一项
+        current_fluid_name = (get("fluid_data") or _EMPTY).get("name", "")
+        idx = self.oil_combo.findText(current_fluid_name) if current_fluid_name else -1
+        self.oil_combo.setCurrentIndex(max(idx, 0))
 
-    def _open_line_dialog(self, idx: int):
-        if idx < 0 or idx >= len(self._lines):
+        for combo in combos:
+            combo.blockSignals(False)
+        return self.exec_() == QtWidgets.QDialog.Accepted
+
+    @QtCore.pyqtSlot(int)
+    def _on_pump_selected(self, idx: int):
+        data = self.pump_combo.itemData(idx)
+        if data:
+            self.pump_flow.setText(str(data.get("flow", "")))
+            self.pump_head.setText(str(data.get("pressure", "")))
+            self.pump_shutoff.setText(str(data.get("shutoff_pressure", "")))
+            self.pump_type_combo.setCurrentIndex(1 if data.get("pump_type") == "curve" else 0)
+
+    @QtCore.pyqtSlot(int)
+    def _on_tee_selected(self, idx: int):
+        item = self.tee_combo.itemData(idx)
+        if not item:
             return
-        
-        # 实时从文件重新加载管件库
-        self.fittings_store._load()
-        
-        line = self._lines[idx]
-        dlg = QtWidgets.QDialog(self)
-        dlg.resize(300, 500)
-        dlg.setWindowTitle(line.get("label", "线"))
-        layout = QtWidgets.QVBoxLayout(dlg)
+        self.tee_angle.setText(str(item.get("spec", "")))
+        self.tee_k.setText(str(item.get("k_branch", "")))
+        self.tee_ratio.setText(str(item.get("k_run", "")))
+        self.remark_edit_t.setText(str(item.get("remark", "")))
+
+    @QtCore.pyqtSlot(int)
+    def _on_valve_selected(self, idx: int):
+        item = self.valve_combo.itemData(idx)
+        if not item:
+            return
+        self.valve_type.setText(str(item.get("name", "")))
+        self.valve_dia.setText(str(item.get("dn", "")))
+        self.valve_k.setText(str(item.get("Kv", "")))
+        self.remark_edit_v.setText(str(item.get("remark", "")))
+
+    @QtCore.pyqtSlot()
+    def _on_accept(self):
+        point = self._point
+        ptype = _DISPLAY_TO_PTYPE.get(self.type_box.currentText(), "normal")
+        point["ptype"] = ptype
+        point["elevation"] = self.elevation_edit.text().strip()
+        if ptype == "normal":
+            pget = (self.fittings_combo.currentData() or _EMPTY).get
+            point["fitting_id"] = pget("id", "")
+            point["fitting_name"] = pget("name", "")
+            point["fitting_k"] = pget("k", "")
+            point["fitting_angle"] = pget("angle", "")
+            point["remark"] = self.remark_edit_n.text().strip()
+            point.update(_BLANK_FOR["normal"])
+        elif ptype == "pump":
+            point["pump_type"] = "curve" if self.pump_type_combo.currentIndex() == 1 else "gear"
+            point["pump_flow"] = self.pump_flow.text().strip()
+            point["pump_head"] = self.pump_head.text().strip()
+            point["pump_speed"] = self.pump_shutoff.text().strip() # 借用 speed 存离心泵关死压力
+            point["remark"] = self.remark_edit_p.text().strip()
+            point.update(_BLANK_FOR["pump"])
+        elif ptype == "tee":
+            # 选型时 _on_tee_selected 已把条目数据写入各输入框，这里统一以输入框（含用户随后的修改）为准
+            point["tee_angle"] = self.tee_angle.text().strip()
+            point["tee_ratio"] = self.tee_ratio.text().strip()
+            point["tee_k"] = self.tee_k.text().strip()
+            point["tee_main_dia"] = self.tee_main_dia.text().strip()
+            point["tee_branch_dia"] = self.tee_branch_dia.text().strip()
+            point["remark"] = self.remark_edit_t.text().strip()
+            point.update(_BLANK_FOR["tee"])
+        elif ptype == "valve":
+            # 同上，选型数据经 _on_valve_selected 写入输入框
+            point["valve_type"] = self.valve_type.text().strip()
+            point["valve_dia"] = self.valve_dia.text().strip()
+            point["valve_open"] = self.valve_open.text().strip()
+            point["valve_k"] = self.valve_k.text().strip()
+            point["remark"] = self.remark_edit_v.text().strip()
+            point.update(_BLANK_FOR["valve"])
+        elif ptype == "tank":
+            point["fluid_data"] = self.oil_combo.currentData()
+            point["remark"] = self.remark_edit_tank.text().strip()
+            # 清理其他类型数据
+            point.update(_BLANK_FOR["tank"])
+        self.accept()
+
+
+class _LineDialog(QtWidgets.QDialog):
+    """线属性对话框：控件只创建一次，每次编辑时重置内容后复用"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._line = None
+        self._entries = None  # 当前下拉框填充所用的选项列表
+        self.resize(300, 500)
+        layout = QtWidgets.QVBoxLayout(self)
         form = QtWidgets.QFormLayout()
-        lbl_se = QtWidgets.QLabel(f"{self._find_point_label(line.get('start'))} -> {self._find_point_label(line.get('end'))}")
-        pipe_combo = QtWidgets.QComboBox()
-        pipe_combo.addItem("（不选择）", userData=None)
-        for item in self.fittings_store.all():
-            if item.get("category") == "直管":
-                txt = f"{item.get('name','')} | DN{item.get('dn','')} | ID={item.get('id_mm','')}"
-                pipe_combo.addItem(txt, userData=item)
-        dia_edit = QtWidgets.QLineEdit(str(line.get("diameter", "")))
-        len_edit = QtWidgets.QLineEdit(str(line.get("length", "")))
-        remark_edit = QtWidgets.QLineEdit(str(line.get("remark", "")))
-        form.addRow("两端", lbl_se)
-        form.addRow("类型/规格", pipe_combo)
-        form.addRow("直径(mm)", dia_edit)
-        form.addRow("长度(m)", len_edit)
-        form.addRow("备注", remark_edit)
+        self.lbl_se = QtWidgets.QLabel()
+        self.pipe_combo = QtWidgets.QComboBox()
+        self.dia_edit = QtWidgets.QLineEdit()
+        self.len_edit = QtWidgets.QLineEdit()
+        self.remark_edit = QtWidgets.QLineEdit()
+        form.addRow("两端", self.lbl_se)
+        form.addRow("类型/规格", self.pipe_combo)
+        form.addRow("直径(mm)", self.dia_edit)
+        form.addRow("长度(m)", self.len_edit)
+        form.addRow("备注", self.remark_edit)
         layout.addLayout(form)
         btn_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
         ok_btn = btn_box.button(QtWidgets.QDialogButtonBox.Ok)
@@ -886,57 +1265,57 @@ class GridWidget(QtWidgets.QWidget):
             cancel_btn.setStyleSheet("background:#d9d9d9; color:#333; border:none; padding:6px 12px; border-radius:4px;")
         layout.addWidget(btn_box)
 
+        self.pipe_combo.currentIndexChanged.connect(self._on_pipe_change)
+        btn_box.accepted.connect(self._on_accept)
+        btn_box.rejected.connect(self.reject)
+
+    def edit(self, line: dict, endpoints: str, entries) -> bool:
+        """以 line 的当前值重置表单并模态显示；确定时已写回 line，返回 True"""
+        self._line = line
+        self.setWindowTitle(line.get("label", "线"))
+        self.lbl_se.setText(endpoints)
+        self.dia_edit.setText(str(line.get("diameter", "")))
+        self.len_edit.setText(str(line.get("length", "")))
+        self.remark_edit.setText(str(line.get("remark", "")))
+        combo = self.pipe_combo
+        # 预选不应触发 _on_pipe_change 改写刚重置的字段
+        combo.blockSignals(True)
+        if entries is not self._entries:
+            combo.clear()
+            combo.addItem("（不选择）", userData=None)
+            for txt, item in entries:
+                combo.addItem(txt, userData=item)
+            self._entries = entries
+        combo.setCurrentIndex(0)
         # 预选：若直径与某直管ID(计算内径)匹配，则选中
-        try:
-            dia_val = str(line.get("diameter", "")).strip()
-            for idx in range(pipe_combo.count()):
-                data = pipe_combo.itemData(idx)
-                if not data:
-                    continue
-                if dia_val and str(data.get("id_mm", "")) == dia_val:
-                    pipe_combo.setCurrentIndex(idx)
+        dia_val = str(line.get("diameter", "")).strip()
+        if dia_val:
+            for idx, (_, item) in enumerate(entries, start=1):
+                if str(item.get("id_mm", "")) == dia_val:
+                    combo.setCurrentIndex(idx)
                     break
-        except Exception:
-            pass
-
-        def on_pipe_change(idx: int):
-            data = pipe_combo.itemData(idx)
-            if data:
-                dia_edit.setText(str(data.get("id_mm", "")))
-                if not remark_edit.text().strip():
-                    remark_edit.setText(str(data.get("name", "")))
-
-        pipe_combo.currentIndexChanged.connect(on_pipe_change)
-
-        def on_accept():
-            data = pipe_combo.currentData()
-            if data:
-                line["diameter"] = str(data.get("id_mm", ""))
-                if not len_edit.text().strip():
-                    line["length"] = ""
-                line["remark"] = remark_edit.text().strip() or str(data.get("name", ""))
-            else:
-                line["diameter"] = dia_edit.text().strip()
-            line["length"] = len_edit.text().strip()
-            line["remark"] = remark_edit.text().strip()
-            self._persist_line(line)
-            self.update()
-            dlg.accept()
-
-        btn_box.accepted.connect(on_accept)
-        btn_box.rejected.connect(dlg.reject)
-        dlg.exec_()
-
-    def _show_info_dialog(self, title: str):
-        # 已废弃，保留接口占位
-        msg = QtWidgets.QMessageBox(self)
-        msg.setWindowTitle(title or "")
-        msg.setText("")
-        msg.setStandardButtons(QtWidgets.QMessageBox.Ok | QtWidgets.QMessageBox.Cancel)
-        msg.exec_()
+        combo.blockSignals(False)
+        return self.exec_() == QtWidgets.QDialog.Accepted
 
-    def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
-        # 使网格中心与画布中心对齐
-        self._offset = QtCore.QPointF(-self.width() / (2 * self._scale), -self.height() / (2 * self._scale))
-        super().resizeEvent(event)
+    @QtCore.pyqtSlot(int)
+    def _on_pipe_change(self, idx: int):
+        data = self.pipe_combo.itemData(idx)
+        if data:
+            self.dia_edit.setText(str(data.get("id_mm", "")))
+            if not self.remark_edit.text().strip():
+                self.remark_edit.setText(str(data.get("name", "")))
 
+    @QtCore.pyqtSlot()
+    def _on_accept(self):
+        line = self._line
+        data = self.pipe_combo.currentData()
+        if data:
+            line["diameter"] = str(data.get("id_mm", ""))
+            if not self.len_edit.text().strip():
+                line["length"] = ""
+            line["remark"] = self.remark_edit.text().strip() or str(data.get("name", ""))
+        else:
+            line["diameter"] = self.dia_edit.text().strip()
+        line["length"] = self.len_edit.text().strip()
+        line["remark"] = self.remark_edit.text().strip()
+        self.accept()
@@ -1,91 +1,214 @@
 import json
 import os
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
+from PyQt5 import QtCore
+from .design_point import DesignPoint
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时使用标准库 json
+    orjson = None
+
+
+def _loads(raw: bytes):
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+
+def _encode(obj):
+    # 点以 DesignPoint 存放，序列化时转回 dict
+    if isinstance(obj, DesignPoint):
+        return obj.to_dict()
+    raise TypeError(f"无法序列化的类型: {type(obj).__name__}")
+
+
+def _dumps(data, pretty: bool = False) -> bytes:
+    """默认输出紧凑 JSON（该文件不供人工编辑）；pretty=True 时缩进 2 格便于查看"""
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(data, default=_encode, option=option)
+    if pretty:
+        return json.dumps(data, ensure_ascii=False, indent=2, default=_encode).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_encode).encode("utf-8")
 
 
 class TemporaryData:
     """
     临时拓扑数据（点、线），存储到 JSON 以供后续计算。
-    points: [{label,x,y,ptype,...扩展}]
+    points: [DesignPoint(label,x,y,ptype,...扩展)]，落盘时为 dict
     lines: [{label,start_label,end_label,diameter,length,remark}]
     """
 
     def __init__(self, json_path: str):
         self.json_path = json_path
         self.data = {"points": [], "lines": []}
+        # 索引：点/线 label -> 在列表中的下标；点 label -> 以其为端点的线 label 集合
+        self._pt_idx: Dict[str, int] = {}
+        self._ln_idx: Dict[str, int] = {}
+        self._lines_by_endpoint: Dict[str, Set[str]] = {}
+        # 延迟写盘：修改只置脏标记，停止修改 200ms 后统一写一次
+        self._dirty = False
+        self._pretty = False  # 下次写盘是否缩进输出
+        self._flush_timer: Optional[QtCore.QTimer] = None
+        os.makedirs(os.path.dirname(self.json_path), exist_ok=True)
         self._load()
+        self._reindex()
 
     def _load(self):
-        os.makedirs(os.path.dirname(self.json_path), exist_ok=True)
         if os.path.exists(self.json_path):
             try:
-                with open(self.json_path, "r", encoding="utf-8") as f:
-                    self.data = json.load(f)
+                with open(self.json_path, "rb") as f:
+                    self.data = _loads(f.read())
             except Exception:
                 self.data = {"points": [], "lines": []}
         else:
-            self._save()
+            self._write()
+
+    def _reindex(self):
+        """按当前 data 重建全部索引（点统一转为 DesignPoint）；重复 label 以首个为准，与线性查找一致"""
+        points = self.data.setdefault("points", [])
+        points[:] = [DesignPoint.from_dict(p) for p in points]
+        self._pt_idx = {}
+        for i, p in enumerate(points):
+            self._pt_idx.setdefault(p.get("label"), i)
+        self._ln_idx = {}
+        self._lines_by_endpoint = {}
+        for i, ln in enumerate(self.data.setdefault("lines", [])):
+            self._ln_idx.setdefault(ln.get("label"), i)
+            self._link_endpoints(ln)
 
-    def _save(self):
-        with open(self.json_path, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=2)
+    def _link_endpoints(self, line: Dict):
+        for key in ("start_label", "end_label"):
+            ep = line.get(key)
+            if ep:
+                self._lines_by_endpoint.setdefault(ep, set()).add(line.get("label"))
+
+    def _unlink_endpoints(self, line: Dict):
+        for key in ("start_label", "end_label"):
+            labels = self._lines_by_endpoint.get(line.get(key))
+            if labels is not None:
+                labels.discard(line.get("label"))
+
+    def as_dict(self) -> Dict:
+        """转为纯 dict/list 结构（用于另存为工程文件等）"""
+        return {**self.data, "points": [p.to_dict() for p in self.data["points"]]}
+
+    def replace(self, data: Dict):
+        """整体替换数据（如打开工程）并落盘"""
+        self.data = data
+        self._reindex()
+        self._save()
+
+    def _save(self, pretty: bool = False):
+        """标记数据已修改并（重新）计时，连续修改只触发一次写盘；pretty 用于需要人工查看文件时"""
+        self._dirty = True
+        self._pretty = pretty
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_timer is None:
+            self._flush_timer = QtCore.QTimer()
+            self._flush_timer.setSingleShot(True)
+            self._flush_timer.setInterval(200)
+            self._flush_timer.timeout.connect(self._flush_now)
+        self._flush_timer.start()
+
+    def _flush_now(self):
+        if self._dirty:
+            self._write()
+
+    def flush(self):
+        """立即写入尚未落盘的修改（读取文件前、退出前调用）"""
+        if self._flush_timer is not None:
+            self._flush_timer.stop()
+        self._flush_now()
+
+    def _write(self):
+        # 先写临时文件再原子替换，写入中途中断不会留下截断的 JSON；文件很小，不做 fsync
+        tmp = self.json_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_dumps(self.data, self._pretty))
+        os.replace(tmp, self.json_path)
+        self._dirty = False
 
     # Points
-    def upsert_point(self, point: Dict):
+    def upsert_point(self, point):
+        """point 可为 dict 或 DesignPoint；按副本保存，不与调用方共享"""
         label = point.get("label")
         if not label:
             return
-        found = False
-        for i, p in enumerate(self.data.get("points", [])):
-            if p.get("label") == label:
-                self.data["points"][i] = point
-                found = True
-                break
-        if not found:
-            self.data["points"].append(point)
+        point = DesignPoint.from_dict(point)
+        points = self.data["points"]
+        i = self._pt_idx.get(label)
+        if i is not None:
+            points[i] = point
+        else:
+            self._pt_idx[label] = len(points)
+            points.append(point)
         self._save()
 
-    def get_point(self, label: str) -> Optional[Dict]:
-        for p in self.data.get("points", []):
-            if p.get("label") == label:
-                return p
-        return None
+    def get_point(self, label: str) -> Optional[DesignPoint]:
+        try:
+            return self.data["points"][self._pt_idx[label]]
+        except KeyError:
+            return None
 
     # Lines
     def upsert_line(self, line: Dict):
         label = line.get("label")
         if not label:
             return
-        found = False
-        for i, ln in enumerate(self.data.get("lines", [])):
-            if ln.get("label") == label:
-                self.data["lines"][i] = line
-                found = True
-                break
-        if not found:
-            self.data["lines"].append(line)
+        lines = self.data["lines"]
+        i = self._ln_idx.get(label)
+        if i is not None:
+            self._unlink_endpoints(lines[i])
+            lines[i] = line
+        else:
+            self._ln_idx[label] = len(lines)
+            lines.append(line)
+        self._link_endpoints(line)
         self._save()
 
     def get_line(self, label: str) -> Optional[Dict]:
-        for ln in self.data.get("lines", []):
-            if ln.get("label") == label:
-                return ln
-        return None
+        try:
+            return self.data["lines"][self._ln_idx[label]]
+        except KeyError:
+            return None
 
     def delete_point(self, label: str):
         """删除特定点及其关联的所有线"""
-        self.data["points"] = [p for p in self.data.get("points", []) if p.get("label") != label]
-        # 同时删除所有起止点包含该 label 的线
-        self.data["lines"] = [ln for ln in self.data.get("lines", []) 
-                             if ln.get("start_label") != label and ln.get("end_label") != label]
+        i = self._pt_idx.pop(label, None)
+        if i is not None:
+            self._swap_pop(self.data["points"], self._pt_idx, i)
+        # 同时删除所有起止点包含该 label 的线（由端点索引直接取得）
+        for ln_label in self._lines_by_endpoint.pop(label, ()):
+            self._remove_line(ln_label)
         self._save()
 
     def delete_line(self, label: str):
         """删除特定线"""
-        self.data["lines"] = [ln for ln in self.data.get("lines", []) if ln.get("label") != label]
+        self._remove_line(label)
         self._save()
 
+    def _remove_line(self, label: str):
+        i = self._ln_idx.pop(label, None)
+        if i is None:
+            return
+        lines = self.data["lines"]
+        self._unlink_endpoints(lines[i])
+        self._swap_pop(lines, self._ln_idx, i)
+
+    @staticmethod
+    def _swap_pop(items: List[Dict], index: Dict[str, int], i: int):
+        """O(1) 删除 items[i]：用末尾元素填补空位，只修正被移动元素的下标（列表顺序会改变）"""
+        last = items.pop()
+        if i < len(items):
+            items[i] = last
+            if index.get(last.get("label")) == len(items):
+                index[last.get("label")] = i
+
     def clear(self):
         """清空所有临时数据"""
         self.data = {"points": [], "lines": []}
-        self._save()
\ No newline at end of file
+        self._reindex()
+        self._save()
+        self.flush()
\ No newline at end of file
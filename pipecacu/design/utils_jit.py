@@ -0,0 +1,48 @@
+"""
+画板命中测试的数值内核。
+安装了 numba 时使用 JIT 编译的逐线段循环；否则退回等价的 NumPy 向量化实现。
+
+投影参数 t 的截断写成无分支形式 t = relu(u) - relu(u - 1)，分母加极小量以免退化线段除零，
+便于 LLVM 对循环做 SIMD 向量化。
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba 为可选依赖
+    njit = None
+
+_EPS = np.float32(1e-12)  # 坐标列为 float32，常量同精度以免运算被提升为 float64
+
+
+def _hit_line_numpy(px, py, sx, sy, ex, ey, thr2):
+    dx = ex - sx
+    dy = ey - sy
+    u = ((px - sx) * dx + (py - sy) * dy) / (dx * dx + dy * dy + _EPS)
+    t = np.maximum(u, 0.0) - np.maximum(u - 1.0, 0.0)
+    d2 = (px - (sx + t * dx)) ** 2 + (py - (sy + t * dy)) ** 2
+    if d2.shape[0] == 0:
+        return -1
+    i = int(np.argmin(d2))
+    return i if d2[i] <= thr2 else -1
+
+
+def _hit_line_loop(px, py, sx, sy, ex, ey, thr2):
+    best = -1
+    bd = thr2 + 1
+    for i in range(sx.shape[0]):
+        dx = ex[i] - sx[i]
+        dy = ey[i] - sy[i]
+        u = ((px - sx[i]) * dx + (py - sy[i]) * dy) / (dx * dx + dy * dy + _EPS)
+        t = max(u, 0.0) - max(u - 1.0, 0.0)
+        qx = sx[i] + t * dx
+        qy = sy[i] + t * dy
+        d = (px - qx) ** 2 + (py - qy) ** 2
+        if d < bd:
+            bd = d
+            best = i
+    return best if bd <= thr2 else -1
+
+
+# hit_line_np(px, py, sx, sy, ex, ey, thr2) -> 距离平方不超过 thr2 的最近线段下标，无则 -1
+hit_line_np = njit(cache=True, fastmath=True)(_hit_line_loop) if njit else _hit_line_numpy
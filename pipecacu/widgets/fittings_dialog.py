@@ -2,6 +2,45 @@ import os
 from PyQt5 import QtWidgets, QtGui, QtCore
 from datasystem.fittings_store import FittingsStore
 
+# 表格分类 -> (表头, 每列取值的键)；键为 (主键, 备用键) 时主键缺失则取备用键
+_TABLE_SCHEMA = {
+    "直管": (
+        ("ID", "名称", "公称通径DN", "外径(mm)", "壁厚(mm)", "计算内径(mm)", "备注"),
+        ("id", "name", "dn", "od", "thickness", "id_mm", "remark"),
+    ),
+    "油品": (
+        ("ID", "名称", "15℃密度", "40℃粘度", "100℃粘度", "备注"),
+        ("id", "name", "rho_15", "v_40", "v_100", "remark"),
+    ),
+    "阀门": (
+        ("ID", "名称", "公称通径DN", "Cv", "Kv", "阻力特性", "备注"),
+        ("id", "name", "dn", "Cv", "Kv", "resistance", "remark"),
+    ),
+    "泵": (
+        ("ID", "名称", "型号", "额定流量(m³/h)", "额定压力(kPa)", "用途", "备注"),
+        ("id", "name", "model", "flow", "pressure", ("usage", "remark"), "remark"),
+    ),
+    "三通": (
+        ("ID", "名称", "规格", "直通阻力(K)", "支路阻力(K)", "备注"),
+        ("id", "name", "spec", "k_run", "k_branch", "remark"),
+    ),
+    "默认": (
+        ("ID", "名称", "分类", "角度/类型", "K 值", "入径(mm)", "出径(mm)"),
+        ("id", "name", "category", ("angle", "spec"), "k", "inDiameter", "outDiameter"),
+    ),
+}
+
+
+def _lookup(it: dict, k):
+    if isinstance(k, tuple):
+        return it.get(k[0], it.get(k[1], ""))
+    return it.get(k, "")
+
+
+def _s(v) -> str:
+    # 大多数字段本就是 str，直接返回，避免 str() 再构造一次；None 显示为空
+    return v if type(v) is str else ("" if v is None else str(v))
+
 
 class FittingsDialog(QtWidgets.QDialog):
     """管件库：仅管理“条例”条目（名称/分类/角度/K等），不与取点对接。"""
@@ -114,14 +153,17 @@ class FittingsDialog(QtWidgets.QDialog):
         main_layout.addLayout(body)
 
     def _bind(self):
+        # 槽函数用 pyqtSlot 声明签名：connect 时即按 C++ 签名匹配，
+        # 带参数的信号（clicked(bool)、currentIndexChanged(int) 等）触发时不再先以多余参数调用失败再重试
         self.add_btn.clicked.connect(self._on_add)
         self.save_btn.clicked.connect(self._on_save)
         self.del_btn.clicked.connect(self._on_delete)
         self.filter_box.currentIndexChanged.connect(self._refresh_table)
         self.search_edit.textChanged.connect(self._refresh_table)
         self.table.itemSelectionChanged.connect(self._on_select_row)
-        self.category_box.currentTextChanged.connect(self._on_category_change)
+        self.category_box.currentTextChanged.connect(self._switch_form)
 
+    @QtCore.pyqtSlot()
     def _on_add(self):
         # 填入默认空值
         self.id_edit.setText(f"fit_{int(QtCore.QDateTime.currentMSecsSinceEpoch())}")
@@ -141,6 +183,7 @@ class FittingsDialog(QtWidgets.QDialog):
         self.remark_edit_p.clear()
         self._switch_form(self.category_box.currentText())
 
+    @QtCore.pyqtSlot()
     def _on_save(self):
         cat = self.category_box.currentText()
         if cat == "直管":
@@ -191,6 +234,7 @@ class FittingsDialog(QtWidgets.QDialog):
         self._refresh_table()
         self._select_by_id(item["id"])
 
+    @QtCore.pyqtSlot()
     def _on_delete(self):
         rows = self.table.selectionModel().selectedRows()
         if not rows:
@@ -199,6 +243,7 @@ class FittingsDialog(QtWidgets.QDialog):
         self.store.delete(item_id)
         self._refresh_table()
 
+    @QtCore.pyqtSlot()
     def _on_select_row(self):
         rows = self.table.selectionModel().selectedRows()
         if not rows:
@@ -235,23 +280,38 @@ class FittingsDialog(QtWidgets.QDialog):
             self.remark_edit.setText(item.get("remark", ""))
         self._switch_form(self.category_box.currentText())
 
+    @QtCore.pyqtSlot()
     def _refresh_table(self):
-        items = self.store.all()
         filt = self.filter_box.currentText()
         keyword = self.search_edit.text().strip()
-        filtered = []
-        for it in items:
-            if filt != "全部" and it.get("category") != filt:
-                continue
-            if keyword and keyword not in it.get("name", "") and keyword not in it.get("category", ""):
-                continue
-            filtered.append(it)
+        # 选定分类时直接取分类索引中的条目，只遍历该分类；关键字过滤在循环外确定，filter 惰性求值，过滤与填表一趟完成
+        items = self.store.all() if filt == "全部" else self.store.iter_category(filt)
+        rows = iter(items)
+        if keyword:
+            rows = filter(lambda it: keyword in it.get("name", "") or keyword in it.get("category", ""), rows)
 
         cat_for_table = filt if filt != "全部" else "默认"
+        table = self.table
+        fill_row = self._fill_row
         self._set_table_columns(cat_for_table)
-        self.table.setRowCount(len(filtered))
-        for r, it in enumerate(filtered):
-            self._fill_row(self.table, r, it, cat_for_table)
+        sorting = table.isSortingEnabled()
+        table.setSortingEnabled(False)
+        table.setUpdatesEnabled(False)
+        table.blockSignals(True)
+        try:
+            # 行数只增不清空：已有行的单元格在 _fill_row 中原地改写，填完后再截断到实际行数
+            if table.rowCount() < len(items):
+                table.setRowCount(len(items))
+            r = 0
+            for it in rows:
+                fill_row(table, r, it, cat_for_table)
+                r += 1
+            if table.rowCount() != r:
+                table.setRowCount(r)
+        finally:
+            table.blockSignals(False)
+            table.setUpdatesEnabled(True)
+            table.setSortingEnabled(sorting)
 
     def _select_by_id(self, item_id: str):
         for r in range(self.table.rowCount()):
@@ -272,6 +332,7 @@ class FittingsDialog(QtWidgets.QDialog):
         filt = self.filter_box.currentText()
         return filt if filt != "全部" else "默认"
 
+    @QtCore.pyqtSlot(str)
     def _switch_form(self, cat: str):
         if cat == "直管":
             self.form_stack.setCurrentIndex(1)
@@ -280,74 +341,22 @@ class FittingsDialog(QtWidgets.QDialog):
         else:
             self.form_stack.setCurrentIndex(0)
 
-    def _on_category_change(self, text: str):
-        self._switch_form(text)
-
     def _set_table_columns(self, cat: str):
-        if cat == "直管":
-            self.table.setColumnCount(7)
-            self.table.setHorizontalHeaderLabels(["ID", "名称", "公称通径DN", "外径(mm)", "壁厚(mm)", "计算内径(mm)", "备注"])
-        elif cat == "阀门":
-            self.table.setColumnCount(7)
-            self.table.setHorizontalHeaderLabels(["ID", "名称", "公称通径DN", "Cv", "Kv", "阻力特性", "备注"])
-        elif cat == "泵":
-            self.table.setColumnCount(7)
-            self.table.setHorizontalHeaderLabels(["ID", "名称", "型号", "额定流量(m³/h)", "额定压力(kPa)", "用途", "备注"])
-        elif cat == "三通":
-            self.table.setColumnCount(6)
-            self.table.setHorizontalHeaderLabels(["ID", "名称", "规格", "直通阻力(K)", "支路阻力(K)", "备注"])
-        elif cat == "油品":
-            self.table.setColumnCount(6)
-            self.table.setHorizontalHeaderLabels(["ID", "名称", "15℃密度", "40℃粘度", "100℃粘度", "备注"])
-        else:
-            self.table.setColumnCount(7)
-            self.table.setHorizontalHeaderLabels(["ID", "名称", "分类", "角度/类型", "K 值", "入径(mm)", "出径(mm)"])
+        headers = _TABLE_SCHEMA.get(cat, _TABLE_SCHEMA["默认"])[0]
+        self.table.setColumnCount(len(headers))
+        self.table.setHorizontalHeaderLabels(list(headers))
 
-    def _fill_row(self, table, r: int, it: dict, cat_for_table: str):
-        if cat_for_table == "直管":
-            table.setItem(r, 0, QtWidgets.QTableWidgetItem(str(it.get("id", ""))))
-            table.setItem(r, 1, QtWidgets.QTableWidgetItem(str(it.get("name", ""))))
-            table.setItem(r, 2, QtWidgets.QTableWidgetItem(str(it.get("dn", ""))))
-            table.setItem(r, 3, QtWidgets.QTableWidgetItem(str(it.get("od", ""))))
-            table.setItem(r, 4, QtWidgets.QTableWidgetItem(str(it.get("thickness", ""))))
-            table.setItem(r, 5, QtWidgets.QTableWidgetItem(str(it.get("id_mm", ""))))
-            table.setItem(r, 6, QtWidgets.QTableWidgetItem(str(it.get("remark", ""))))
-        elif cat_for_table == "油品":
-            table.setItem(r, 0, QtWidgets.QTableWidgetItem(str(it.get("id", ""))))
-            table.setItem(r, 1, QtWidgets.QTableWidgetItem(str(it.get("name", ""))))
-            table.setItem(r, 2, QtWidgets.QTableWidgetItem(str(it.get("rho_15", ""))))
-            table.setItem(r, 3, QtWidgets.QTableWidgetItem(str(it.get("v_40", ""))))
-            table.setItem(r, 4, QtWidgets.QTableWidgetItem(str(it.get("v_100", ""))))
-            table.setItem(r, 5, QtWidgets.QTableWidgetItem(str(it.get("remark", ""))))
-        elif cat_for_table == "阀门":
-            table.setItem(r, 0, QtWidgets.QTableWidgetItem(str(it.get("id", ""))))
-            table.setItem(r, 1, QtWidgets.QTableWidgetItem(str(it.get("name", ""))))
-            table.setItem(r, 2, QtWidgets.QTableWidgetItem(str(it.get("dn", ""))))
-            table.setItem(r, 3, QtWidgets.QTableWidgetItem(str(it.get("Cv", ""))))
-            table.setItem(r, 4, QtWidgets.QTableWidgetItem(str(it.get("Kv", ""))))
-            table.setItem(r, 5, QtWidgets.QTableWidgetItem(str(it.get("resistance", ""))))
-            table.setItem(r, 6, QtWidgets.QTableWidgetItem(str(it.get("remark", ""))))
-        elif cat_for_table == "泵":
-            table.setItem(r, 0, QtWidgets.QTableWidgetItem(str(it.get("id", ""))))
-            table.setItem(r, 1, QtWidgets.QTableWidgetItem(str(it.get("name", ""))))
-            table.setItem(r, 2, QtWidgets.QTableWidgetItem(str(it.get("model", ""))))
-            table.setItem(r, 3, QtWidgets.QTableWidgetItem(str(it.get("flow", ""))))
-            table.setItem(r, 4, QtWidgets.QTableWidgetItem(str(it.get("pressure", ""))))
-            table.setItem(r, 5, QtWidgets.QTableWidgetItem(str(it.get("usage", it.get("remark", "")))))
-            table.setItem(r, 6, QtWidgets.QTableWidgetItem(str(it.get("remark", ""))))
-        elif cat_for_table == "三通":
-            table.setItem(r, 0, QtWidgets.QTableWidgetItem(str(it.get("id", ""))))
-            table.setItem(r, 1, QtWidgets.QTableWidgetItem(str(it.get("name", ""))))
-            table.setItem(r, 2, QtWidgets.QTableWidgetItem(str(it.get("spec", ""))))
-            table.setItem(r, 3, QtWidgets.QTableWidgetItem(str(it.get("k_run", ""))))
-            table.setItem(r, 4, QtWidgets.QTableWidgetItem(str(it.get("k_branch", ""))))
-            table.setItem(r, 5, QtWidgets.QTableWidgetItem(str(it.get("remark", ""))))
-        else:
-            table.setItem(r, 0, QtWidgets.QTableWidgetItem(str(it.get("id", ""))))
-            table.setItem(r, 1, QtWidgets.QTableWidgetItem(str(it.get("name", ""))))
-            table.setItem(r, 2, QtWidgets.QTableWidgetItem(str(it.get("category", ""))))
-            table.setItem(r, 3, QtWidgets.QTableWidgetItem(str(it.get("angle", it.get("spec", "")))))
-            table.setItem(r, 4, QtWidgets.QTableWidgetItem(str(it.get("k", ""))))
-            table.setItem(r, 5, QtWidgets.QTableWidgetItem(str(it.get("inDiameter", ""))))
-            table.setItem(r, 6, QtWidgets.QTableWidgetItem(str(it.get("outDiameter", ""))))
+    @staticmethod
+    def _set_cell(table, r: int, c: int, text: str):
+        # 复用已有单元格对象，只更新文字；新行/新列才创建 QTableWidgetItem
+        item = table.item(r, c)
+        if item is None:
+            item = QtWidgets.QTableWidgetItem()
+            table.setItem(r, c, item)
+        item.setText(text)
 
+    def _fill_row(self, table, r: int, it: dict, cat_for_table: str):
+        set_cell = self._set_cell
+        keys = _TABLE_SCHEMA.get(cat_for_table, _TABLE_SCHEMA["默认"])[1]
+        for c, k in enumerate(keys):
+            set_cell(table, r, c, _s(_lookup(it, k)))